@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import QueuedEmail
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'status', 'attempts', 'next_attempt', 'created',
+                    'sent')
+    list_filter = ('status',)
+    exclude = ('payload',)
+    readonly_fields = ('claim', 'last_error', 'created', 'sent')
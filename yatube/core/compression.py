@@ -0,0 +1,93 @@
+"""Сжатие ответов на лету: gzip и, если установлен brotli, br."""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него сжимаем только gzip
+    brotli = None
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, param = part.partition(';')
+        param = param.replace(' ', '')
+        if param.startswith('q='):
+            try:
+                if float(param[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(request):
+    """Лучшая доступная кодировка, которую принимает клиент, или None."""
+    accepted = accepted_encodings(request)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class GzipStream:
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        # Z_SYNC_FLUSH выталкивает всё накопленное, не закрывая поток.
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+STREAMS = {'gzip': GzipStream, 'br': BrotliStream}
+
+
+def compress(data, coding, level):
+    stream = STREAMS[coding](level)
+    return stream.compress(data) + stream.finish()
+
+
+def compress_stream(chunks, coding, level, flush_size):
+    """Сжимает поток по кускам.
+
+    Первый кусок (шапка страницы) сбрасывается клиенту сразу, дальше
+    сброс — когда набралось flush_size несжатых байт: сброс после
+    каждой строки выгрузки раздувал бы тело и тратил время.
+    """
+    stream = STREAMS[coding](level)
+    pending = None
+    for chunk in chunks:
+        data = stream.compress(chunk)
+        if pending is None or pending + len(chunk) >= flush_size:
+            data += stream.flush()
+            pending = 0
+        else:
+            pending += len(chunk)
+        if data:
+            yield data
+    yield stream.finish()
@@ -0,0 +1,210 @@
+"""Очередь исходящей почты.
+
+QueuedEmailBackend сохраняет письма в таблицу QueuedEmail и сразу
+возвращает управление. Пул из EMAIL_QUEUE_WORKERS потоков забирает
+созревшие письма пачками по EMAIL_QUEUE_BATCH_SIZE и отправляет пачку
+через EMAIL_QUEUE_BACKEND одним соединением. Неудачное письмо
+повторяется с удваивающейся паузой, пока не кончатся попытки.
+"""
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from . import perf
+from .models import QueuedEmail
+from .workers import WorkerPool
+
+logger = logging.getLogger('yatube.mail')
+
+pool = WorkerPool('mail', 'EMAIL_QUEUE_WORKERS')
+
+# Сколько последних доставок учитывать в перцентилях задержки.
+LATENCY_WINDOW = 1000
+
+_lock = threading.Lock()
+_latencies = deque(maxlen=LATENCY_WINDOW)
+_counters = dict.fromkeys(('sent', 'retried', 'failed'), 0)
+_timer = None
+
+
+def dump(message):
+    """pickle письма без соединения, через которое его отправили."""
+    connection = message.connection
+    message.connection = None
+    try:
+        return pickle.dumps(message)
+    finally:
+        message.connection = connection
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Кладёт письма в очередь; отправляет их пул core.mail."""
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        QueuedEmail.objects.bulk_create([
+            QueuedEmail(payload=dump(message)) for message in email_messages
+        ])
+        wake()
+        return len(email_messages)
+
+
+def wake():
+    """Разбирает очередь в пуле после коммита; без пула — сразу."""
+    if not pool.enabled():
+        drain()
+        return
+    transaction.on_commit(lambda: pool.submit(drain))
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def claim(batch_size):
+    """Забирает пачку созревших писем под меткой этого обработчика.
+
+    Письмо, зависшее в отправке дольше EMAIL_QUEUE_CLAIM_TIMEOUT
+    (обработчик упал), снова считается созревшим.
+    """
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(
+        status__in=(QueuedEmail.QUEUED, QueuedEmail.SENDING),
+        next_attempt__lte=now,
+    )
+    ids = list(due.order_by('next_attempt').values_list(
+        'pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    # Условие due повторяется в UPDATE: письмо, которое успел забрать
+    # другой поток, уже не созрело и под эту метку не попадёт.
+    due.filter(pk__in=ids).update(
+        status=QueuedEmail.SENDING,
+        claim=token,
+        next_attempt=now + timedelta(
+            seconds=settings.EMAIL_QUEUE_CLAIM_TIMEOUT),
+    )
+    return list(QueuedEmail.objects.filter(claim=token))
+
+
+def deliver(batch):
+    """Отправляет пачку одним соединением; возвращает (sent, failed)."""
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        return [], [(row, error) for row in batch]
+    sent, failed = [], []
+    try:
+        for row in batch:
+            try:
+                connection.send_messages([pickle.loads(row.payload)])
+            except Exception as error:
+                failed.append((row, error))
+            else:
+                sent.append(row)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def finish(sent, failed):
+    now = timezone.now()
+    QueuedEmail.objects.filter(pk__in=[row.pk for row in sent]).update(
+        status=QueuedEmail.SENT,
+        sent=now,
+        attempts=F('attempts') + 1,
+        claim='',
+        last_error='',
+    )
+    retried = 0
+    for row, error in failed:
+        attempts = row.attempts + 1
+        final = attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS
+        retried += not final
+        logger.warning(
+            'Письмо %s не отправлено (попытка %s): %r', row.pk, attempts,
+            error)
+        QueuedEmail.objects.filter(pk=row.pk).update(
+            status=QueuedEmail.FAILED if final else QueuedEmail.QUEUED,
+            attempts=attempts,
+            claim='',
+            last_error=repr(error),
+            next_attempt=now + retry_delay(attempts),
+        )
+    with _lock:
+        _latencies.extend(
+            (now - row.created).total_seconds() for row in sent)
+        _counters['sent'] += len(sent)
+        _counters['retried'] += retried
+        _counters['failed'] += len(failed) - retried
+
+
+def drain():
+    """Отправляет созревшие письма пачками, пока они есть."""
+    while True:
+        batch = claim(settings.EMAIL_QUEUE_BATCH_SIZE)
+        if not batch:
+            break
+        finish(*deliver(batch))
+    if pool.enabled():
+        plan_retry()
+
+
+def plan_retry():
+    """Будит пул к ближайшему повтору, если он запланирован."""
+    global _timer
+    upcoming = QueuedEmail.objects.filter(
+        status=QueuedEmail.QUEUED).aggregate(at=Min('next_attempt'))['at']
+    if upcoming is None:
+        return
+    delay = max((upcoming - timezone.now()).total_seconds(), 0)
+    with _lock:
+        if _timer is not None and _timer.at <= time.monotonic() + delay:
+            return
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(delay, pool.submit, args=(drain,))
+        _timer.at = time.monotonic() + delay
+        _timer.daemon = True
+        _timer.start()
+
+
+def snapshot():
+    """Глубина очереди и задержка доставки в мс по последним письмам."""
+    pending = QueuedEmail.objects.filter(
+        status__in=(QueuedEmail.QUEUED, QueuedEmail.SENDING))
+    oldest = pending.aggregate(at=Min('created'))['at']
+    with _lock:
+        latencies = sorted(value * 1000 for value in _latencies)
+        counters = dict(_counters)
+    return {
+        'queue_depth': pending.count(),
+        'oldest_queued_seconds': (
+            (timezone.now() - oldest).total_seconds() if oldest else None),
+        'delivery_latency_ms': {
+            f'p{rank}': perf.percentile(latencies, rank)
+            for rank in perf.PERCENTILES
+        } if latencies else {},
+        **counters,
+    }
+
+
+def reset():
+    with _lock:
+        _latencies.clear()
+        _counters.update(dict.fromkeys(_counters, 0))
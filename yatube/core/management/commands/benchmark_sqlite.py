@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+
+from core.perf import percentile
+from posts.models import Post, User
+
+# Значения SQLite по умолчанию: журнал отката и полная синхронизация.
+DEFAULT_PRAGMAS = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременных '
+        'чтениях ленты и записи постов: настройки по умолчанию против '
+        'SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=8, help='Потоков чтения.')
+        parser.add_argument(
+            '--writers', type=int, default=2, help='Потоков записи.')
+        parser.add_argument(
+            '--seconds', type=float, default=5, help='Длительность замера.')
+        parser.add_argument(
+            '--posts', type=int, default=10_000,
+            help='Постов в базе до начала замера.')
+        parser.add_argument(
+            '--output', help='Куда дополнительно записать результаты в JSON.')
+
+    def handle(self, *args, **options):
+        if options['readers'] < 0 or options['writers'] < 0 or not (
+                options['readers'] + options['writers']):
+            raise CommandError('Нужен хотя бы один поток чтения или записи')
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер имеет смысл только для SQLite')
+        profiles = {
+            'default': DEFAULT_PRAGMAS,
+            'tuned': settings.SQLITE_PRAGMAS,
+        }
+        report = {}
+        for name, pragmas in profiles.items():
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                report[name] = self.run(options)
+            stats = report[name]
+            self.stdout.write(
+                f"{name}: чтений {stats['reads_per_second']:.0f}/с "
+                f"(p99 {stats['read_p99_ms'] or 0:.1f} мс), "
+                f"записей {stats['writes_per_second']:.0f}/с "
+                f"(p99 {stats['write_p99_ms'] or 0:.1f} мс), "
+                f"ошибок блокировки {stats['locked']}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def run(self, options):
+        old_name = connection.settings_dict['NAME']
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        old_test_name = test_settings.get('NAME')
+        with tempfile.TemporaryDirectory() as directory:
+            test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False)
+            try:
+                call_command(
+                    'seed_yatube', users=100, groups=10,
+                    posts=options['posts'], seed=0, stdout=StringIO())
+                return self.measure(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings['NAME'] = old_test_name
+
+    def measure(self, options):
+        author_ids = list(User.objects.values_list('pk', flat=True))
+        deadline = time.monotonic() + options['seconds']
+        lock = threading.Lock()
+        results = {'read': [], 'write': [], 'locked': 0}
+
+        def worker(kind, number):
+            latencies, locked = [], 0
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        if kind == 'read':
+                            list(Post.objects.select_related(
+                                'author', 'group')[:settings.POSTS_ON_PAGE])
+                        else:
+                            Post.objects.create(
+                                text=f'Замер {number}',
+                                author_id=author_ids[
+                                    number % len(author_ids)],
+                            )
+                    except OperationalError:
+                        locked += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            with lock:
+                results[kind].extend(latencies)
+                results['locked'] += locked
+
+        threads = [
+            threading.Thread(target=worker, args=('read', number))
+            for number in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('write', number))
+            for number in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reads = sorted(value * 1000 for value in results['read'])
+        writes = sorted(value * 1000 for value in results['write'])
+        return {
+            'reads_per_second': len(reads) / options['seconds'],
+            'writes_per_second': len(writes) / options['seconds'],
+            'read_p50_ms': percentile(reads, 50),
+            'read_p99_ms': percentile(reads, 99),
+            'write_p50_ms': percentile(writes, 50),
+            'write_p99_ms': percentile(writes, 99),
+            'locked': results['locked'],
+        }
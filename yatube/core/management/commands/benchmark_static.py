@@ -0,0 +1,94 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.views import serve_static
+
+PIPELINE = 'core.storage.CompressedManifestStaticFilesStorage'
+PLAIN = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+BROWSER_ENCODING = 'gzip, deflate, br'
+
+
+def body_size(response):
+    size = sum(len(chunk) for chunk in response.streaming_content) \
+        if response.streaming else len(response.content)
+    response.close()
+    return size
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает байты статики на проводе: обычные имена без сжатия '
+        'против имён с хэшем и готовых .gz/.br.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', help='Куда дополнительно записать результаты в JSON.')
+
+    def handle(self, *args, **options):
+        report = {}
+        for mode, storage in (('plain', PLAIN), ('pipeline', PIPELINE)):
+            with tempfile.TemporaryDirectory() as root, override_settings(
+                    STATIC_ROOT=root, STATICFILES_STORAGE=storage):
+                call_command(
+                    'collectstatic', interactive=False, verbosity=0,
+                    stdout=StringIO())
+                report[mode] = self.measure()
+            stats = report[mode]
+            self.stdout.write(
+                f"{mode}: первый визит {stats['first_visit_bytes']} Б "
+                f"в {stats['files']} файлах, повторный — "
+                f"{stats['repeat_visit_requests']} запросов"
+            )
+        saved = 1 - (report['pipeline']['first_visit_bytes']
+                     / report['plain']['first_visit_bytes'])
+        report['saving'] = saved
+        self.stdout.write(self.style.SUCCESS(f'Экономия байтов: {saved:.1%}'))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def names(self):
+        """Имена, по которым браузер запрашивает статику со страниц."""
+        hashed = getattr(staticfiles_storage, 'hashed_files', None)
+        if hashed:
+            return sorted(hashed.values())
+        found, dirs = [], ['']
+        while dirs:
+            directory = dirs.pop()
+            subdirs, files = staticfiles_storage.listdir(directory)
+            dirs.extend(f'{directory}{name}/' for name in subdirs)
+            found.extend(f'{directory}{name}' for name in files)
+        return sorted(found)
+
+    def measure(self):
+        factory = RequestFactory()
+        files = {}
+        for name in self.names():
+            request = factory.get(
+                settings.STATIC_URL + name,
+                HTTP_ACCEPT_ENCODING=BROWSER_ENCODING)
+            response = serve_static(request, name)
+            files[name] = {
+                'bytes': body_size(response),
+                'encoding': response.get('Content-Encoding', 'identity'),
+                'cache_control': response['Cache-Control'],
+            }
+        return {
+            'files': len(files),
+            'first_visit_bytes': sum(row['bytes'] for row in files.values()),
+            # Без immutable браузер перепроверяет каждый файл (304).
+            'repeat_visit_requests': sum(
+                'immutable' not in row['cache_control']
+                for row in files.values()),
+            'detail': files,
+        }
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.templatetags.fragment_cache import fragment_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша фрагментов шаблонов.'
+
+    def handle(self, *args, **options):
+        for name, stats in fragment_cache_stats().items():
+            total = stats['hit'] + stats['miss']
+            ratio = stats['hit'] / total if total else 0
+            self.stdout.write(
+                f"{name}: попаданий {stats['hit']}, "
+                f"промахов {stats['miss']}, доля {ratio:.1%}"
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core import mail
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет созревшие письма из очереди и показывает её состояние. '
+        'Нужна, если пул EMAIL_QUEUE_WORKERS выключен или процесс '
+        'перезапускался с письмами в очереди.'
+    )
+
+    def handle(self, *args, **options):
+        mail.drain()
+        report = mail.snapshot()
+        latency = ', '.join(
+            f'{name} {value:.1f} мс'
+            for name, value in report['delivery_latency_ms'].items())
+        self.stdout.write(
+            f"в очереди {report['queue_depth']}, "
+            f"отправлено {report['sent']}, повторов {report['retried']}, "
+            f"не отправлено {report['failed']}"
+        )
+        if latency:
+            self.stdout.write(f'задержка доставки: {latency}')
@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файл реплики через backup API; '
+        'с --interval повторяет копирование в цикле.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Секунд между синхронизациями; без него — один раз.')
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE
+        if alias not in settings.DATABASES:
+            raise CommandError(f'В DATABASES нет реплики {alias!r}')
+        for name in ('default', alias):
+            if connections[name].vendor != 'sqlite':
+                raise CommandError(
+                    'Локальная синхронизация поддерживает только SQLite')
+        source = connections['default'].settings_dict['NAME']
+        target = connections[alias].settings_dict['NAME']
+        if source == target:
+            raise CommandError('Реплика совпадает с основной базой')
+        while True:
+            started = time.monotonic()
+            self.sync(source, target)
+            self.stdout.write(
+                f'Реплика обновлена за {time.monotonic() - started:.2f} с')
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
+
+    def sync(self, source, target):
+        # backup() копирует согласованный снимок и блокирует реплику
+        # только на время записи страниц.
+        src, dst = sqlite3.connect(source), sqlite3.connect(target)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
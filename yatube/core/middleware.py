@@ -0,0 +1,163 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import perf
+from .compression import compress, compress_stream, negotiate
+from .routers import replica_ready, use_replica, wrote
+from .slow_queries import SlowQueryLogger
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def sql_timer(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        perf.add('sql_time', time.perf_counter() - started)
+        perf.add('sql_count', 1)
+
+
+class PerformanceMiddleware:
+    """Замеряет время ответа, SQL и шаблоны по resolver_match.view_name.
+
+    В выборку попадает доля PERFORMANCE_SAMPLE_RATE запросов; остальные
+    проходят без обёрток, поэтому малая доля годится и для продакшена.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PERFORMANCE_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+        sample = perf.start_sample()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_timer))
+                response = self.get_response(request)
+        finally:
+            match = request.resolver_match
+            perf.record(match.view_name if match else '-', sample)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Пишет в журнал yatube.slow_queries запросы дольше
+    SLOW_QUERY_THRESHOLD_MS вместе с именем представления и планом."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    SlowQueryLogger(request)))
+            return self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплики для представлений из REPLICA_VIEWS.
+
+    После записи (любой небезопасный метод или запись через роутер)
+    ставит cookie REPLICA_PIN_COOKIE: пока она жива, клиент читает
+    с основной базы и видит собственные изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.use_replica = False
+        wrote_token = wrote.set(False)
+        replica_token = use_replica.set(False)
+        try:
+            response = self.get_response(request)
+            if wrote.get() or request.method not in SAFE_METHODS:
+                sticky = settings.REPLICA_STICKY_SECONDS
+                response.set_cookie(
+                    settings.REPLICA_PIN_COOKIE,
+                    str(int(time.time() + sticky)),
+                    max_age=sticky,
+                    httponly=True,
+                    samesite='Lax',
+                )
+            return response
+        finally:
+            wrote.reset(wrote_token)
+            use_replica.reset(replica_token)
+
+    def pinned(self, request):
+        try:
+            until = int(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0))
+        except ValueError:
+            return False
+        return until > time.time()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.use_replica = (
+            request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and not self.pinned(request)
+            and replica_ready()
+        )
+        use_replica.set(request.use_replica)
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы кодировкой из Accept-Encoding.
+
+    Не трогает уже сжатые ответы (есть Content-Encoding или тип не из
+    COMPRESS_TYPES) и тела короче COMPRESS_MIN_SIZE. Потоковый ответ
+    сжимается по кускам: начало страницы уходит клиенту сразу, не
+    дожидаясь конца рендера, остальное — порциями по
+    COMPRESS_STREAM_FLUSH_SIZE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate(request)
+        if coding is None:
+            return response
+        level = settings.COMPRESS_LEVEL
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, coding, level,
+                settings.COMPRESS_STREAM_FLUSH_SIZE)
+            del response['Content-Length']
+        else:
+            content = compress(response.content, coding, level)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Сжатое тело побайтно отличается от исходного.
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
+
+    def compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        content_type = response.get('Content-Type', '').partition(';')[0]
+        if not content_type.strip().lower().startswith(
+                settings.COMPRESS_TYPES):
+            return False
+        return (response.streaming
+                or len(response.content) >= settings.COMPRESS_MIN_SIZE)
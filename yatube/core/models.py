@@ -0,0 +1,48 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди core.mail.QueuedEmailBackend."""
+    QUEUED = 'queued'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    payload = models.BinaryField(verbose_name='Письмо')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name='Состояние',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток')
+    next_attempt = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка')
+    claim = models.CharField(
+        max_length=32, blank=True, verbose_name='Метка обработчика')
+    last_error = models.TextField(
+        blank=True, verbose_name='Последняя ошибка')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Поставлено в очередь')
+    sent = models.DateTimeField(
+        null=True, blank=True, verbose_name='Отправлено')
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            models.Index(fields=('status', 'next_attempt'),
+                         name='queued_email_due_idx'),
+            models.Index(fields=('claim',), name='queued_email_claim_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.pk}: {self.status}'
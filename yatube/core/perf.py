@@ -0,0 +1,93 @@
+"""Метрики запросов в памяти процесса: скользящие окна по представлениям.
+
+Каждый процесс копит свои замеры; страница /performance/ показывает
+данные того процесса, который её обслужил.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+METRICS = ('wall', 'sql_count', 'sql_time', 'template_time')
+
+# Границы корзин гистограммы времени ответа, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+PERCENTILES = (50, 95, 99)
+
+# Замер текущего запроса; None, если запрос не попал в выборку.
+current_sample = ContextVar('current_sample', default=None)
+
+_lock = threading.Lock()
+_samples = defaultdict(
+    lambda: deque(maxlen=settings.PERFORMANCE_WINDOW))
+
+
+def start_sample():
+    sample = dict.fromkeys(METRICS, 0)
+    sample['started'] = time.perf_counter()
+    current_sample.set(sample)
+    return sample
+
+
+def add(metric, value):
+    """Добавляет value к метрике текущего замера, если он идёт."""
+    sample = current_sample.get()
+    if sample is not None:
+        sample[metric] += value
+
+
+def record(view_name, sample):
+    sample['wall'] = time.perf_counter() - sample.pop('started')
+    current_sample.set(None)
+    with _lock:
+        _samples[view_name].append(sample)
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+
+
+def percentile(ordered, rank):
+    """Перцентиль rank отсортированного списка; None для пустого."""
+    if not ordered:
+        return None
+    index = max(0, round(rank / 100 * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def histogram(values):
+    """Число замеров в корзинах BUCKETS плюс «больше последней»."""
+    counts = [0] * (len(BUCKETS) + 1)
+    for value in values:
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+def snapshot():
+    """Сводка по представлениям: среднее и перцентили, время — в мс."""
+    with _lock:
+        windows = {name: list(rows) for name, rows in _samples.items()}
+    report = {}
+    for name, rows in sorted(windows.items()):
+        stats = {'requests': len(rows)}
+        for metric in METRICS:
+            scale = 1 if metric == 'sql_count' else 1000
+            values = sorted(row[metric] * scale for row in rows)
+            stats[metric] = {
+                'mean': sum(values) / len(values),
+                **{f'p{rank}': percentile(values, rank)
+                   for rank in PERCENTILES},
+                'max': values[-1],
+            }
+        stats['histogram'] = histogram(row['wall'] * 1000 for row in rows)
+        report[name] = stats
+    return report
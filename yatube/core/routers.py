@@ -0,0 +1,53 @@
+import os
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Читать ли текущему запросу с реплики; решает ReplicaMiddleware.
+use_replica = ContextVar('use_replica', default=False)
+
+# Была ли в текущем запросе запись: после неё читатель «прилипает»
+# к основной базе на REPLICA_STICKY_SECONDS.
+wrote = ContextVar('wrote', default=False)
+
+# Сессии меняются при каждом входе, очередь писем (core) — при каждой
+# отправке: их всегда читаем с основной базы.
+PRIMARY_ONLY_APPS = {'sessions', 'core'}
+
+
+def replica_ready():
+    """Реплика настроена, не зеркало основной базы и (для SQLite) есть."""
+    alias = settings.REPLICA_DATABASE
+    if alias not in settings.DATABASES:
+        return False
+    replica = connections[alias].settings_dict
+    if replica['NAME'] == connections['default'].settings_dict['NAME']:
+        # В тестах реплика — зеркало default: читаем напрямую, иначе
+        # второе соединение не увидит незакоммиченных данных теста.
+        return False
+    if connections[alias].vendor == 'sqlite':
+        return os.path.exists(replica['NAME'])
+    return True
+
+
+class ReplicaRouter:
+    """Чтения лент — на реплику, все записи и миграции — на default."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return 'default'
+        if use_replica.get():
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия default, объекты из обеих баз совместимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,115 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Одинаковые после нормализации запросы одного представления пишутся
+не чаще раза в SLOW_QUERY_DEDUPE_SECONDS; пропущенные повторы
+считаются и попадают в следующую запись.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger('yatube.slow_queries')
+
+STRINGS = re.compile(r"'(?:[^']|'')*'")
+NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LISTS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+SPACES = re.compile(r'\s+')
+
+# Не даёт EXPLAIN самому пройти через обёртку.
+_explaining = ContextVar('explaining', default=False)
+
+_lock = threading.Lock()
+_seen = {}
+
+
+def normalize(sql):
+    """SQL без литералов и с одним «?» на список параметров IN (…)."""
+    sql = STRINGS.sub('?', sql)
+    sql = NUMBERS.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = PLACEHOLDER_LISTS.sub('(...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = ('EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite'
+              else 'EXPLAIN ')
+    token = _explaining.set(True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [' '.join(map(str, row)) for row in cursor.fetchall()]
+    except DatabaseError as error:
+        return [f'EXPLAIN не удался: {error}']
+    finally:
+        _explaining.reset(token)
+
+
+def claim(key, now):
+    """Разрешает запись раз в окно и возвращает число пропущенных повторов."""
+    with _lock:
+        logged_at, skipped = _seen.get(key, (None, 0))
+        if (logged_at is not None
+                and now - logged_at < settings.SLOW_QUERY_DEDUPE_SECONDS):
+            _seen[key] = (logged_at, skipped + 1)
+            return None
+        _seen[key] = (now, 0)
+        return skipped
+
+
+def reset():
+    with _lock:
+        _seen.clear()
+
+
+class SlowQueryLogger:
+    """Обёртка для connection.execute_wrapper() в рамках одного запроса."""
+
+    def __init__(self, request):
+        self.request = request
+
+    @property
+    def view_name(self):
+        match = self.request.resolver_match
+        return match.view_name if match else '-'
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.log(context['connection'], sql, params, many, duration)
+
+    def log(self, connection, sql, params, many, duration):
+        normalized = normalize(sql)
+        view_name = self.view_name
+        key = hashlib.md5(
+            f'{connection.alias}|{view_name}|{normalized}'.encode()
+        ).hexdigest()
+        skipped = claim(key, time.monotonic())
+        if skipped is None:
+            return
+        logger.warning(json.dumps({
+            'time': timezone.now().isoformat(),
+            'view': view_name,
+            'database': connection.alias,
+            'duration_ms': round(duration, 3),
+            'sql': normalized,
+            'fingerprint': key,
+            'repeats': skipped,
+            'plan': None if many else explain(connection, sql, params),
+        }, ensure_ascii=False))
@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.functional import cached_property
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него пишутся только .gz
+    brotli = None
+
+# Сжимаем только текстовые форматы: PNG и подобные уже сжаты.
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map')
+
+# Копия, которая экономит меньше этой доли, того не стоит.
+MIN_SAVING = 0.05
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Имена с хэшем содержимого, manifest и сжатые копии .gz/.br.
+
+    Копии готовятся один раз при collectstatic, поэтому сервер отдаёт
+    их без сжатия на лету (core.views.serve_static).
+    """
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if not dry_run and isinstance(hashed_name, str):
+                self.compress(name)
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        for suffix, compress in compressors():
+            packed = compress(data)
+            if len(packed) <= len(data) * (1 - MIN_SAVING):
+                with open(path + suffix, 'wb') as file:
+                    file.write(packed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def stored_name(self, name):
+        # Без collectstatic (разработка, тесты) отдаём исходное имя,
+        # а не падаем на отсутствующей записи manifest.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    @cached_property
+    def hashed_names(self):
+        return set(self.hashed_files.values())
+
+    def is_hashed(self, name):
+        """Имя из manifest с хэшем: его содержимое никогда не меняется."""
+        return name in self.hashed_names
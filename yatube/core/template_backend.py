@@ -0,0 +1,34 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import perf
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        sample = perf.current_sample.get()
+        if sample is None:
+            return super().render(context, request)
+        sql_before = sample['sql_time']
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            # Ленивые QuerySet выполняются прямо в шаблоне: их время уже
+            # учтено как SQL, поэтому из времени рендера его вычитаем.
+            elapsed = time.perf_counter() - started
+            sample['template_time'] += elapsed - (
+                sample['sql_time'] - sql_before)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблоны Django, которые засекают рендер для PerformanceMiddleware."""
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
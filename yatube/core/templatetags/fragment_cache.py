@@ -0,0 +1,75 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+register = template.Library()
+
+STATS_KEY = 'fragment-cache:{}'
+
+
+def fragment_cache_stats():
+    """Счётчики попаданий и промахов по именам фрагментов."""
+    stats = cache.get(STATS_KEY.format('names')) or set()
+    keys = [
+        STATS_KEY.format(f'{name}:{result}')
+        for name in stats for result in ('hit', 'miss')
+    ]
+    values = cache.get_many(keys)
+    return {
+        name: {
+            result: values.get(STATS_KEY.format(f'{name}:{result}'), 0)
+            for result in ('hit', 'miss')
+        }
+        for name in sorted(stats)
+    }
+
+
+def count(name, result):
+    key = STATS_KEY.format(f'{name}:{result}')
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+        names = cache.get(STATS_KEY.format('names')) or set()
+        if name not in names:
+            cache.set(STATS_KEY.format('names'), names | {name}, None)
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        value = cache.get(key)
+        if value is not None:
+            count(self.fragment_name, 'hit')
+            return value
+        count(self.fragment_name, 'miss')
+        value = self.nodelist.render(context)
+        cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+        return value
+
+
+@register.tag('fragment_cache')
+def do_fragment_cache(parser, token):
+    """{% fragment_cache name var1 var2 %}...{% endfragment_cache %}
+
+    Как {% cache %}, но таймаут берётся из FRAGMENT_CACHE_TIMEOUT,
+    а попадания и промахи считаются по имени фрагмента.
+    """
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 1 argument.")
+    return FragmentCacheNode(
+        nodelist,
+        bits[1],
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
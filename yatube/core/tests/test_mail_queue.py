@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail as django_mail
+from django.core.mail.backends.filebased import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import User
+from .. import mail
+from ..models import QueuedEmail
+
+EMAIL_FILE_PATH = tempfile.mkdtemp()
+
+
+class FlakyBackend(EmailBackend):
+    """Файловый бэкенд, который не может отправить ни одного письма."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+    EMAIL_FILE_PATH=EMAIL_FILE_PATH,
+    EMAIL_QUEUE_RETRY_DELAY=10,
+    EMAIL_QUEUE_MAX_ATTEMPTS=2,
+)
+class QueuedEmailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='forgetful', email='forgetful@example.com',
+            password='secret-password')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(EMAIL_FILE_PATH, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        mail.reset()
+        for name in os.listdir(EMAIL_FILE_PATH):
+            os.remove(os.path.join(EMAIL_FILE_PATH, name))
+
+    def sent_files(self):
+        return os.listdir(EMAIL_FILE_PATH)
+
+    def test_password_reset_goes_through_queue(self):
+        """Письмо сброса пароля проходит очередь и доходит до файла."""
+        self.client.post(reverse('users:password_reset_form'),
+                         {'email': self.user.email})
+        row = QueuedEmail.objects.get()
+        self.assertEqual(row.status, QueuedEmail.SENT)
+        self.assertEqual(row.attempts, 1)
+        files = self.sent_files()
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(EMAIL_FILE_PATH, files[0])) as sent:
+            self.assertIn(self.user.email, sent.read())
+
+    def test_send_returns_before_delivery(self):
+        """С пулом отправка только ставит письмо в очередь."""
+        with mock.patch.object(mail.pool, 'enabled', return_value=True), \
+                mock.patch.object(mail.pool, 'submit') as submit:
+            with mock.patch('django.db.transaction.on_commit',
+                            side_effect=lambda func: func()):
+                sent = django_mail.send_mail(
+                    'Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        self.assertEqual(sent, 1)
+        submit.assert_called_once_with(mail.drain)
+        self.assertEqual(QueuedEmail.objects.get().status,
+                         QueuedEmail.QUEUED)
+        self.assertEqual(self.sent_files(), [])
+        self.assertEqual(mail.snapshot()['queue_depth'], 1)
+
+    def test_batch_sent_in_one_connection(self):
+        """Пачка писем уходит через одно соединение бэкенда."""
+        with mock.patch.object(mail.pool, 'enabled', return_value=True), \
+                mock.patch('django.db.transaction.on_commit'):
+            django_mail.send_mass_mail([
+                ('Тема', f'Письмо №{number}', 'from@example.com',
+                 ['to@example.com'])
+                for number in range(3)
+            ])
+        with mock.patch('core.mail.get_connection',
+                        wraps=mail.get_connection) as get_connection:
+            mail.drain()
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(self.sent_files()), 1)
+        self.assertEqual(
+            QueuedEmail.objects.filter(status=QueuedEmail.SENT).count(), 3)
+        report = mail.snapshot()
+        self.assertEqual(report['queue_depth'], 0)
+        self.assertEqual(report['sent'], 3)
+        self.assertEqual(
+            set(report['delivery_latency_ms']), {'p50', 'p95', 'p99'})
+
+    @override_settings(EMAIL_QUEUE_BACKEND=f'{__name__}.FlakyBackend')
+    def test_failed_message_retried_then_given_up(self):
+        """Неудачное письмо ждёт повтора, а после всех попыток — failed."""
+        django_mail.send_mail(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        row = QueuedEmail.objects.get()
+        self.assertEqual(row.status, QueuedEmail.QUEUED)
+        self.assertEqual(row.attempts, 1)
+        self.assertIn('SMTP недоступен', row.last_error)
+        self.assertGreater(row.next_attempt, timezone.now())
+        # До срока повтор не забирается.
+        self.assertEqual(mail.claim(10), [])
+        QueuedEmail.objects.update(next_attempt=timezone.now())
+        mail.drain()
+        row.refresh_from_db()
+        self.assertEqual(row.status, QueuedEmail.FAILED)
+        self.assertEqual(row.attempts, 2)
+        report = mail.snapshot()
+        self.assertEqual((report['retried'], report['failed']), (1, 1))
+        self.assertEqual(report['queue_depth'], 0)
+
+    def test_claimed_message_not_taken_twice(self):
+        """Забранное письмо не достаётся второму обработчику до таймаута."""
+        with mock.patch.object(mail.pool, 'enabled', return_value=True), \
+                mock.patch('django.db.transaction.on_commit'):
+            django_mail.send_mail(
+                'Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        self.assertEqual(len(mail.claim(10)), 1)
+        self.assertEqual(mail.claim(10), [])
+        QueuedEmail.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(mail.claim(10)), 1)
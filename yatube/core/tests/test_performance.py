@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from .. import perf
+
+
+class PerformanceMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='watcher')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        perf.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_request_is_measured_by_view_name(self):
+        """Запрос попадает в окно своего представления со всеми метриками."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        report = perf.snapshot()
+        self.assertEqual(
+            set(report), {'posts:index', 'posts:post_detail'})
+        index = report['posts:index']
+        self.assertEqual(index['requests'], 1)
+        self.assertGreater(index['sql_count']['max'], 0)
+        self.assertGreater(index['template_time']['max'], 0)
+        self.assertGreaterEqual(
+            index['wall']['max'],
+            index['sql_time']['max'] + index['template_time']['max'])
+        self.assertEqual(sum(index['histogram']), 1)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0)
+    def test_sampling_can_skip_requests(self):
+        """При нулевой доле выборки запросы не замеряются."""
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(perf.snapshot(), {})
+
+    @override_settings(PERFORMANCE_WINDOW=3)
+    def test_window_is_rolling(self):
+        """В окне остаются только последние замеры."""
+        perf.reset()
+        for _ in range(5):
+            self.client.get(reverse('posts:index'))
+        self.assertEqual(perf.snapshot()['posts:index']['requests'], 3)
+
+    def test_page_is_staff_only(self):
+        """Страницу метрик видит только персонал."""
+        url = reverse('performance')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.get(reverse('posts:index'))
+        response = self.staff_client.get(url)
+        self.assertContains(response, 'posts:index')
+        data = self.staff_client.get(url, {'format': 'json'}).json()
+        self.assertIn('posts:index', data)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.cache import (FEED_MODIFIED_KEY, INDEX_FEED, author_feed,
+                         get_feed_version, group_feed)
+from posts.models import Group, Post, User
+from ..routers import ReplicaRouter, replica_ready, use_replica, wrote
+
+
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_follow_request_flag(self):
+        """Чтения идут на реплику, только если это разрешил запрос."""
+        self.assertIsNone(self.router.db_for_read(Post))
+        token = use_replica.set(True)
+        try:
+            self.assertEqual(
+                self.router.db_for_read(Post), settings.REPLICA_DATABASE)
+            self.assertEqual(self.router.db_for_read(Session), 'default')
+        finally:
+            use_replica.reset(token)
+
+    def test_writes_and_migrations_stay_on_default(self):
+        """Записи и миграции — только в основную базу."""
+        token = wrote.set(False)
+        try:
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            self.assertTrue(wrote.get())
+        finally:
+            wrote.reset(token)
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(
+            self.router.allow_migrate(settings.REPLICA_DATABASE, 'posts'))
+
+    def test_mirror_replica_is_not_used(self):
+        """Реплика-зеркало в тестах не считается отдельной базой."""
+        self.assertFalse(replica_ready())
+
+
+# Реплику подменяем самой default: решение роутера видно, а данные
+# теста остаются в одной транзакции.
+@override_settings(REPLICA_DATABASE='default')
+@mock.patch('core.middleware.replica_ready', return_value=True)
+class ReplicaMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='replica', description='Описание')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        # Ленты давно не меняли: реплика успела их догнать.
+        settled = timezone.now() - timedelta(hours=1)
+        for feed in (INDEX_FEED, group_feed('replica'),
+                     author_feed('reader')):
+            get_feed_version(feed)
+            cache.set(FEED_MODIFIED_KEY.format(feed), settled, None)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feed_views_read_from_replica(self, _):
+        """Ленты и страница поста читают с реплики, остальное — нет."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'replica'}),
+            reverse('posts:profile', kwargs={'username': 'reader'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.wsgi_request.use_replica)
+        response = self.authorized_client.get(reverse('posts:create'))
+        self.assertFalse(response.wsgi_request.use_replica)
+
+    def test_write_pins_reader_to_primary(self, _):
+        """После записи клиент какое-то время читает с основной базы."""
+        response = self.authorized_client.post(
+            reverse('posts:create'), {'text': 'Новый пост'})
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        group_url = reverse('posts:group_list', kwargs={'slug': 'replica'})
+        response = self.authorized_client.get(group_url)
+        self.assertFalse(response.wsgi_request.use_replica)
+        self.authorized_client.cookies[settings.REPLICA_PIN_COOKIE] = '0'
+        response = self.authorized_client.get(group_url)
+        self.assertTrue(response.wsgi_request.use_replica)
+
+    def test_safe_read_does_not_pin(self, _):
+        """Простое чтение ленты не привязывает к основной базе."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_replica_pages_cached(self, _):
+        """Устоявшаяся лента с реплики кэшируется и отдаёт валидаторы."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertTrue(response.wsgi_request.use_replica)
+        self.assertTrue(response.has_header('ETag'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts:index'))
+
+    def test_recent_write_read_from_primary(self, _):
+        """Сразу после записи лента читается с основной базы у всех."""
+        Post.objects.create(text='Свежий пост', author=self.user)
+        for client in (self.client, Client()):
+            response = client.get(reverse('posts:index'))
+            self.assertFalse(response.wsgi_request.use_replica)
+            self.assertContains(response, 'Свежий пост')
+        # Лента группы запись не затронула и читается с реплики.
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'replica'}))
+        self.assertTrue(response.wsgi_request.use_replica)
@@ -0,0 +1,66 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from .. import slow_queries
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='slow')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        slow_queries.reset()
+
+    def entries(self, *urls):
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            for url in urls:
+                self.client.get(url)
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_entry_has_view_sql_and_plan(self):
+        """Запись содержит представление, нормализованный SQL и план."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        entries = self.entries(url)
+        entry = next(
+            entry for entry in entries if '"posts_post"' in entry['sql'])
+        self.assertEqual(entry['view'], 'posts:post_detail')
+        self.assertNotIn(str(self.post.pk), entry['sql'].split('WHERE')[1])
+        self.assertTrue(entry['plan'])
+        self.assertGreaterEqual(entry['duration_ms'], 0)
+
+    def test_repeats_are_deduplicated(self):
+        """Повтор того же запроса в окне не пишется, но считается."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        first = self.entries(url)
+        cache.clear()
+        with self.assertRaises(AssertionError):
+            self.entries(url)
+        with override_settings(SLOW_QUERY_DEDUPE_SECONDS=0):
+            cache.clear()
+            again = self.entries(url)
+        self.assertEqual(len(again), len(first))
+        self.assertTrue(all(entry['repeats'] == 1 for entry in again))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=10_000)
+    def test_fast_queries_are_not_logged(self):
+        """Запросы быстрее порога в журнал не попадают."""
+        with self.assertRaises(AssertionError):
+            self.entries(reverse('posts:index'))
+
+    def test_normalize(self):
+        """Литералы и списки параметров IN сворачиваются."""
+        self.assertEqual(
+            slow_queries.normalize(
+                "SELECT  *\n FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s) "
+                "AND c > 10"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ?',
+        )
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.urls import reverse
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'PRAGMA SQLite')
+class SqliteProfileTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        """Соединение получает настройки из SQLITE_PRAGMAS."""
+        self.assertEqual(
+            self.pragma('busy_timeout'),
+            int(settings.SQLITE_PRAGMAS['busy_timeout']))
+        self.assertEqual(
+            self.pragma('cache_size'),
+            int(settings.SQLITE_PRAGMAS['cache_size']))
+        # normal == 1
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+
+class PersistentConnectionTest(TransactionTestCase):
+    def serve(self, handler):
+        """Запрос через WSGI-обработчик с сигналами начала и конца."""
+        environ = RequestFactory().get(reverse('about:author')).environ
+        response = handler(environ, lambda status, headers: None)
+        b''.join(response)
+        # close() ответа шлёт request_finished: close_old_connections.
+        response.close()
+
+    def test_connection_reused_across_requests(self):
+        """Соединение не закрывается между запросами, пока не устарело."""
+        handler = WSGIHandler()
+        with mock.patch.object(
+                connection, 'close', wraps=connection.close) as close:
+            self.serve(handler)
+            self.serve(handler)
+            close.assert_not_called()
+            close_at, connection.close_at = connection.close_at, 0
+            try:
+                self.serve(handler)
+            finally:
+                connection.close_at = close_at
+            close.assert_called()
@@ -0,0 +1,97 @@
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from ..views import serve_static
+
+PIPELINE = 'core.storage.CompressedManifestStaticFilesStorage'
+CSS = 'css/bootstrap.min.css'
+
+
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(
+            STATIC_ROOT=cls.root, STATICFILES_STORAGE=PIPELINE)
+        cls.settings.enable()
+        call_command(
+            'collectstatic', interactive=False, verbosity=0,
+            stdout=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, path, **headers):
+        request = RequestFactory().get('/static/' + path, **headers)
+        return serve_static(request, path)
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """collectstatic пишет manifest, имя с хэшем и копию .gz."""
+        hashed = staticfiles_storage.stored_name(CSS)
+        self.assertNotEqual(hashed, CSS)
+        path = os.path.join(self.root, hashed)
+        self.assertTrue(os.path.isfile(path))
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.root, 'staticfiles.json')))
+        with open(path, 'rb') as plain, gzip.open(path + '.gz') as packed:
+            self.assertEqual(packed.read(), plain.read())
+
+    def test_images_are_not_compressed(self):
+        """Уже сжатые форматы копий .gz не получают."""
+        hashed = staticfiles_storage.stored_name('img/logo.png')
+        self.assertFalse(
+            os.path.exists(os.path.join(self.root, hashed + '.gz')))
+
+    def test_hashed_file_served_compressed_and_immutable(self):
+        """Имя с хэшем отдаётся сжатым и кэшируется навсегда."""
+        response = self.get(
+            staticfiles_storage.stored_name(CSS),
+            HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response.close()
+
+    def test_rejected_encoding_is_not_used(self):
+        """gzip;q=0 и отсутствие заголовка дают несжатый файл."""
+        name = staticfiles_storage.stored_name(CSS)
+        for headers in ({'HTTP_ACCEPT_ENCODING': 'gzip;q=0'}, {}):
+            with self.subTest(headers=headers):
+                response = self.get(name, **headers)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                response.close()
+
+    def test_unhashed_file_revalidates(self):
+        """Имя без хэша перепроверяется и отвечает 304."""
+        response = self.get(CSS)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        response.close()
+        mtime = os.stat(os.path.join(self.root, CSS)).st_mtime
+        response = self.get(CSS, HTTP_IF_MODIFIED_SINCE=http_date(mtime))
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_and_outside_files_are_404(self):
+        """Неизвестный файл и выход за STATIC_ROOT дают 404."""
+        for path in ('css/missing.css', '../settings.py'):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    self.get(path)
+
+    def test_benchmark_reports_saving(self):
+        """Замер статики показывает экономию байтов."""
+        out = StringIO()
+        call_command('benchmark_static', stdout=out)
+        self.assertIn('Экономия байтов', out.getvalue())
@@ -0,0 +1,86 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponseNotModified,
+                         JsonResponse)
+from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import mail, perf
+from .compression import accepted_encodings
+
+
+@staff_member_required
+def performance(request):
+    report = perf.snapshot()
+    queue = mail.snapshot()
+    if request.GET.get('format') == 'json':
+        data = queue if request.GET.get('section') == 'mail' else report
+        return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+    bounds = [f'≤{bound}' for bound in perf.BUCKETS]
+    bounds.append(f'>{perf.BUCKETS[-1]}')
+    context = {
+        'report': report,
+        'mail': queue,
+        'metrics': perf.METRICS,
+        'percentiles': [f'p{rank}' for rank in perf.PERCENTILES],
+        'buckets': bounds,
+    }
+    return render(request, 'core/performance.html', context)
+
+
+# Кодировки в порядке предпочтения и суффиксы их копий (core.storage).
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def serve_static(request, path):
+    """Статика из STATIC_ROOT с готовыми .br/.gz и долгим кэшем.
+
+    Файлы с хэшем в имени неизменны и кэшируются на STATIC_MAX_AGE,
+    остальные браузер перепроверяет по Last-Modified.
+    """
+    try:
+        full_path = staticfiles_storage.path(path)
+    except (SuspiciousFileOperation, NotImplementedError):
+        raise Http404('Нет такого файла')
+    if not os.path.isfile(full_path):
+        raise Http404('Нет такого файла')
+    stat = os.stat(full_path)
+    hashed = getattr(staticfiles_storage, 'is_hashed', lambda name: False)(
+        path)
+    if not hashed and not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime, stat.st_size):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(full_path)
+    served, encoding = full_path, None
+    variants = [
+        (coding, full_path + suffix) for coding, suffix in STATIC_ENCODINGS
+        if os.path.isfile(full_path + suffix)
+    ]
+    accepted = accepted_encodings(request)
+    for coding, variant in variants:
+        if coding in accepted:
+            served, encoding = variant, coding
+            break
+    response = FileResponse(
+        open(served, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if variants:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if hashed:
+        response['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}, immutable')
+    else:
+        response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
@@ -0,0 +1,41 @@
+"""Пулы фоновых потоков для работы вне запроса: миниатюры, почта."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, connections
+
+
+def run_closing(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Соединения потока пула не закрываются по request_finished.
+        connections.close_all()
+
+
+class WorkerPool:
+    """ThreadPoolExecutor с размером из настройки, создаётся по требованию."""
+
+    def __init__(self, name, size_setting):
+        self.name = name
+        self.size_setting = size_setting
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return getattr(settings, self.size_setting)
+
+    def enabled(self):
+        """Есть ли пул. SQLite в памяти (тесты) потокам не разделить."""
+        in_memory = (connection.vendor == 'sqlite'
+                     and connection.is_in_memory_db())
+        return self.size > 0 and not in_memory
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix=self.name)
+        return self._executor.submit(run_closing, func, *args)
@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db import connection
 
 from .models import Group, Post
+from .search import matching_posts
 
 
 @admin.register(Post)
@@ -11,6 +13,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or connection.vendor != 'sqlite':
+            return super().get_search_results(
+                request, queryset, search_term)
+        return matching_posts(queryset, search_term), False
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
@@ -0,0 +1,163 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+
+from core.routers import use_replica
+
+FEED_VERSION_KEY = 'posts:feed-version:{}'
+FEED_MODIFIED_KEY = 'posts:feed-modified:{}'
+FEED_PAGE_KEY = 'posts:feed-page:{}:{}:{}'
+FEED_COUNT_KEY = 'posts:feed-count:{}:{}'
+
+INDEX_FEED = 'index'
+
+
+def index_feed():
+    return INDEX_FEED
+
+
+def group_feed(slug):
+    return f'group:{slug}'
+
+
+def author_feed(username):
+    return f'author:{username}'
+
+
+def get_feed_version(feed):
+    """Текущее поколение ленты; входит в ключи её закэшированных блоков."""
+    key = FEED_VERSION_KEY.format(feed)
+    version = cache.get(key)
+    if version is None:
+        # После вытеснения ключа начинаем с нового значения, чтобы не
+        # попасть на блоки, закэшированные под старым номером.
+        cache.add(key, time.time_ns(), None)
+        cache.add(FEED_MODIFIED_KEY.format(feed), timezone.now(), None)
+        version = cache.get(key)
+    return version
+
+
+def feed_count_key(feed):
+    """Ключ числа постов ленты; устаревает вместе с её поколением."""
+    return FEED_COUNT_KEY.format(feed, get_feed_version(feed))
+
+
+def get_feed_last_modified(feed):
+    """Время последней записи в ленту (не раньше реального) или None."""
+    return cache.get(FEED_MODIFIED_KEY.format(feed))
+
+
+def bump_feed_versions(feeds):
+    now = timezone.now()
+    for feed in feeds:
+        key = FEED_VERSION_KEY.format(feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+        cache.set(FEED_MODIFIED_KEY.format(feed), now, None)
+
+
+def feed_etag(feed):
+    """etag_func для condition(): поколение ленты, страница и читатель.
+
+    Страница зависит от того, кто её смотрит (шапка, ссылки на правку),
+    поэтому в ETag входит id пользователя.
+    """
+    def etag(request, **kwargs):
+        name = feed(**kwargs)
+        raw = (
+            f'{name}:{get_feed_version(name)}:{request.user.pk}:'
+            f'{request.GET.urlencode()}'
+        )
+        return hashlib.md5(raw.encode()).hexdigest()
+    return etag
+
+
+def feed_last_modified(feed):
+    def last_modified(request, **kwargs):
+        return get_feed_last_modified(feed(**kwargs))
+    return last_modified
+
+
+def feed_settling(feed):
+    """Меняли ли ленту за последние REPLICA_STICKY_SECONDS.
+
+    Столько реплика может отставать: её строки ещё старые, а поколение
+    ленты уже новое.
+    """
+    modified = get_feed_last_modified(feed)
+    return modified is not None and (
+        timezone.now() - modified).total_seconds() < (
+            settings.REPLICA_STICKY_SECONDS)
+
+
+def primary_while_settling(feed):
+    """Читает ленту с основной базы, пока реплика может не догнать запись.
+
+    Иначе устаревшие строки реплики попали бы в кэш страниц, блоков и
+    числа постов под новым поколением ленты. В остальное время чтение
+    с реплики кэшируется как обычно.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not (getattr(request, 'use_replica', False)
+                    and feed_settling(feed(**kwargs))):
+                return view(request, *args, **kwargs)
+            request.use_replica = False
+            token = use_replica.set(False)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                use_replica.reset(token)
+        return wrapper
+    return decorator
+
+
+def cache_when_streamed(response, key):
+    """Кэширует потоковую страницу целиком, когда она отдана до конца."""
+    def chunks(content):
+        parts = []
+        for chunk in content:
+            parts.append(chunk)
+            yield chunk
+        page = HttpResponse(
+            b''.join(parts), content_type=response['Content-Type'])
+        cache.set(key, page, settings.FEED_PAGE_CACHE_TIMEOUT)
+    response.streaming_content = chunks(response.streaming_content)
+
+
+def anonymous_page_cache(feed):
+    """Кэширует страницу ленты целиком для анонимных читателей.
+
+    feed получает именованные аргументы вью и возвращает имя ленты, так что
+    ключ строится из URL без обращения к базе. Запись в ленту меняет её
+    поколение, и старые страницы перестают находиться.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            name = feed(**kwargs)
+            key = FEED_PAGE_KEY.format(
+                name,
+                get_feed_version(name),
+                hashlib.md5(request.GET.urlencode().encode()).hexdigest(),
+            )
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and response.streaming:
+                    cache_when_streamed(response, key)
+                elif response.status_code == 200:
+                    cache.set(key, response, settings.FEED_PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,52 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+EXPORT_FIELDS = ('id', 'pub_date', 'author', 'group', 'text')
+EXPORT_CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку, а не пишет."""
+
+    def write(self, value):
+        return value
+
+
+def export_row(post):
+    return {
+        'id': post.pk,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'group': post.group.slug if post.group else '',
+        'text': post.text,
+    }
+
+
+def stream_posts(posts, fmt):
+    """Построчно отдаёт посты, держа в памяти не больше одного чанка."""
+    posts = posts.select_related('author', 'group').iterator(
+        chunk_size=EXPORT_CHUNK_SIZE)
+    if fmt == 'csv':
+        writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+        yield writer.writeheader()
+        for post in posts:
+            yield writer.writerow(export_row(post))
+        return
+    for post in posts:
+        yield json.dumps(export_row(post), ensure_ascii=False) + '\n'
+
+
+def export_response(posts, fmt, filename):
+    if fmt not in CONTENT_TYPES:
+        fmt = 'csv'
+    response = StreamingHttpResponse(
+        stream_posts(posts, fmt), content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{fmt}"')
+    return response
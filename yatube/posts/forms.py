@@ -7,8 +7,12 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ('text', 'group',)
-        labels = {'text': 'текст', 'group': 'группа'}
+        fields = ('text', 'group', 'image')
+        labels = {
+            'text': 'текст',
+            'group': 'группа',
+            'image': 'картинка',
+        }
         widgets = {
             'text': forms.Textarea(attrs={'class': 'form-control'}),
             'group': forms.Select(attrs={'class': 'form-control'}),
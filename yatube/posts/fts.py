@@ -0,0 +1,44 @@
+"""Схема полнотекстового индекса постов (SQLite FTS5).
+
+Модуль не импортирует модели, чтобы его могли звать миграции.
+"""
+
+FTS_TABLE = 'posts_post_fts'
+
+# Таблица FTS5 с внешним содержимым: текст хранится только в posts_post,
+# а триггеры держат индекс в актуальном состоянии при любых вставках.
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+)
+FTS_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}(rowid, text) "
+    f"VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    f"AFTER UPDATE OF text ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+FTS_DROP_TRIGGERS = tuple(
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"
+    for suffix in ('ai', 'ad', 'au')
+)
+FTS_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def install_fts(schema_editor):
+    """Создаёт индекс и триггеры и переиндексирует посты.
+
+    Нужно вызывать и после миграций, пересоздающих posts_post: SQLite
+    удаляет триггеры вместе со старой таблицей.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FTS_SCHEMA + FTS_TRIGGERS + (FTS_REBUILD,):
+        schema_editor.execute(statement)
@@ -0,0 +1,48 @@
+"""Загрузка группы и автора ленты с коротким кэшем.
+
+Вместе с объектом кэшируется его счётчик постов (stats), поэтому записи
+сбрасываются и при правке группы или пользователя, и при изменении
+их постов (posts.signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Group, User
+
+GROUP_KEY = 'posts:group:{}'
+AUTHOR_KEY = 'posts:author:{}'
+
+
+def load(key, queryset, **lookup):
+    obj = cache.get(key)
+    if obj is None:
+        try:
+            obj = queryset.get(**lookup)
+        except queryset.model.DoesNotExist:
+            raise Http404(f'Нет {queryset.model._meta.verbose_name}')
+        cache.set(key, obj, settings.LOADER_CACHE_TIMEOUT)
+    return obj
+
+
+def get_group_or_404(slug):
+    return load(
+        GROUP_KEY.format(slug),
+        Group.objects.select_related('stats'),
+        slug=slug,
+    )
+
+
+def get_author_or_404(username):
+    return load(
+        AUTHOR_KEY.format(username),
+        User.objects.select_related('stats'),
+        username=username,
+    )
+
+
+def forget(slugs=(), usernames=()):
+    cache.delete_many(
+        [GROUP_KEY.format(slug) for slug in slugs]
+        + [AUTHOR_KEY.format(username) for username in usernames]
+    )
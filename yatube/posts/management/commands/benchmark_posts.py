@@ -0,0 +1,294 @@
+import json
+import random
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from core.perf import percentile
+from posts import urls
+from posts.management.commands.import_posts import insert_posts
+from posts.models import Group, Post, User
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Маршруты, которые открывает только автор; остальные — аноним.
+LOGIN_REQUIRED = {'create', 'post_edit'}
+
+
+def distribution(values):
+    ordered = sorted(values)
+    return {
+        'mean': statistics.mean(values),
+        **{f'p{rank}': percentile(ordered, rank) for rank in PERCENTILES},
+        'max': max(values),
+    }
+
+
+def summarize(samples):
+    return {
+        'requests': len(samples),
+        'statuses': sorted({sample['status'] for sample in samples}),
+        'latency_ms': distribution([s['latency'] for s in samples]),
+        'ttfb_ms': distribution([s['ttfb'] for s in samples]),
+        'queries': {
+            'mean': statistics.mean(s['queries'] for s in samples),
+            'max': max(s['queries'] for s in samples),
+        },
+        'sql_ms': {
+            'mean': statistics.mean(s['sql'] for s in samples),
+            'max': max(s['sql'] for s in samples),
+        },
+    }
+
+
+class QueryCounter:
+    """execute_wrapper для всех баз: число SQL-запросов и их время, с."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - started
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет отдельную базу постами через mixer/Faker и измеряет '
+        'задержку, число и время SQL-запросов каждого маршрута posts.urls.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, nargs='+', default=[10_000],
+            help='Объёмы ленты по возрастанию, например 10000 100000.')
+        parser.add_argument(
+            '--groups', type=int, default=50, help='Число групп.')
+        parser.add_argument(
+            '--authors', type=int, default=500, help='Число авторов.')
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Запросов к каждому маршруту в каждом режиме.')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно случайных данных и выбора страниц.')
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Куда записать результаты в JSON.')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help=('Не удалять базу замеров, чтобы следующий запуск лишь '
+                  'досеял данные; для SQLite нужен TEST["NAME"].'))
+        parser.add_argument(
+            '--use-current-db', action='store_true',
+            help='Мерить на текущей базе вместо отдельной тестовой.')
+
+    def handle(self, *args, **options):
+        volumes = options['posts']
+        if volumes != sorted(volumes) or min(volumes) < 1:
+            raise CommandError('--posts: положительные объёмы по возрастанию')
+        if options['groups'] < 1 or options['authors'] < 1:
+            raise CommandError('--groups и --authors должны быть больше 0')
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть положительным')
+        if options['use_current_db']:
+            report = self.run(volumes, options)
+        else:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+            try:
+                # create_test_db переключает только default: реплика
+                # смотрела бы в настоящий файл, а не в засеянные данные.
+                with override_settings(REPLICA_DATABASE='default'):
+                    report = self.run(volumes, options)
+            finally:
+                connection.creation.destroy_test_db(
+                    old_name, verbosity=0, keepdb=options['keepdb'])
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты записаны в {options["output"]}'))
+
+    def run(self, volumes, options):
+        self.random = random.Random(options['seed'])
+        self.mixer = Mixer(commit=False, locale='ru_RU')
+        self.mixer.faker.seed_instance(options['seed'])
+        report = {
+            'revision': git_revision(),
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'posts_on_page': settings.POSTS_ON_PAGE,
+            'feed_streaming': settings.FEED_STREAMING,
+            'groups': options['groups'],
+            'authors': options['authors'],
+            'requests': options['requests'],
+            'runs': [],
+        }
+        for volume in volumes:
+            self.seed(volume, options['groups'], options['authors'])
+            self.stdout.write(f'Постов: {volume}, замеры маршрутов…')
+            report['runs'].append({
+                'posts': volume,
+                'routes': self.measure(options['requests']),
+            })
+        return report
+
+    def seed(self, volume, groups, authors):
+        """Досевает пользователей, группы и посты до нужных объёмов."""
+        mixer = self.mixer
+        users = User.objects.count()
+        if users < authors:
+            User.objects.bulk_create(mixer.cycle(authors - users).blend(
+                User,
+                username=mixer.sequence(lambda n: f'bench{users + n}'),
+                password='!',
+            ))
+        known = Group.objects.count()
+        if known < groups:
+            Group.objects.bulk_create(mixer.cycle(groups - known).blend(
+                Group,
+                slug=mixer.sequence(lambda n: f'bench-{known + n}'),
+                title=mixer.faker.catch_phrase,
+                description=mixer.faker.paragraph,
+            ))
+        missing = volume - Post.objects.count()
+        if missing <= 0:
+            return
+        author_ids = list(User.objects.values_list('pk', flat=True))
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        now = timezone.now()
+        # Три года истории: лента по pub_date упорядочена осмысленно.
+        span = int(timedelta(days=3 * 365).total_seconds())
+        started = time.monotonic()
+        for offset in range(0, missing, 5000):
+            size = min(5000, missing - offset)
+            posts = mixer.cycle(size).blend(
+                Post,
+                text=mixer.faker.paragraph,
+                image='',
+                author_id=(
+                    self.random.choice(author_ids) for _ in range(size)),
+                group_id=(
+                    self.random.choice(group_ids + [None])
+                    for _ in range(size)),
+                pub_date=(
+                    now - timedelta(seconds=self.random.randrange(span))
+                    for _ in range(size)),
+            )
+            for post in posts:
+                post.render_text()
+            with transaction.atomic():
+                insert_posts(posts)
+        # Вставка обходит сигналы: счётчики пересчитываем целиком.
+        call_command('rebuild_post_counters', stdout=StringIO())
+        cache.clear()
+        self.stdout.write(
+            f'Досеяно постов: {missing} за {time.monotonic() - started:.1f} с')
+
+    def route_urls(self, name):
+        """Бесконечный поток адресов маршрута с разными объектами."""
+        post_ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+        slugs = list(Group.objects.values_list('slug', flat=True)[:1000])
+        usernames = list(
+            User.objects.filter(posts__isnull=False).distinct()
+            .values_list('username', flat=True)[:1000])
+        words = Post.objects.values_list('text', flat=True).first().split()
+        while True:
+            kwargs = {
+                'group_list': {'slug': self.random.choice(slugs)},
+                'group_export': {'slug': self.random.choice(slugs)},
+                'profile': {'username': self.random.choice(usernames)},
+                'profile_export': {
+                    'username': self.random.choice(usernames)},
+                'post_detail': {'post_id': self.random.choice(post_ids)},
+                'post_edit': {'post_id': self.random.choice(post_ids)},
+            }.get(name, {})
+            url = reverse(f'posts:{name}', kwargs=kwargs)
+            if name == 'search':
+                url += '?q=' + self.random.choice(words).strip('.,')
+            elif name in ('index', 'group_list', 'profile'):
+                url += f'?page={self.random.randint(1, 5)}'
+            yield url, kwargs.get('post_id')
+
+    def client_for(self, name, post_id):
+        client = Client()
+        if name in LOGIN_REQUIRED:
+            author = (Post.objects.get(pk=post_id).author if post_id
+                      else User.objects.first())
+            client.force_login(author)
+        return client
+
+    def request(self, client, url):
+        queries = QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(queries))
+            started = time.perf_counter()
+            response = client.get(url)
+            first_byte = None
+            if response.streaming:
+                for _ in response.streaming_content:
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+            finished = time.perf_counter()
+        return {
+            'status': response.status_code,
+            'latency': (finished - started) * 1000,
+            # Обычный ответ уходит целиком: первый байт — в самом конце.
+            'ttfb': ((first_byte or finished) - started) * 1000,
+            'queries': queries.count,
+            'sql': queries.time * 1000,
+        }
+
+    def measure(self, requests):
+        """cold — пустой кэш перед каждым запросом, warm — прогретый."""
+        routes = {}
+        for name in sorted(pattern.name for pattern in urls.urlpatterns):
+            stream = self.route_urls(name)
+            samples = {'cold': [], 'warm': []}
+            for _ in range(requests):
+                url, post_id = next(stream)
+                client = self.client_for(name, post_id)
+                cache.clear()
+                samples['cold'].append(self.request(client, url))
+                samples['warm'].append(self.request(client, url))
+            routes[name] = {
+                mode: summarize(rows) for mode, rows in samples.items()}
+            cold = routes[name]['cold']
+            self.stdout.write(
+                f'  {name}: p50 {cold["latency_ms"]["p50"]:.1f} мс, '
+                f'первый байт p50 {cold["ttfb_ms"]["p50"]:.1f} мс, '
+                f'запросов {cold["queries"]["max"]}')
+        return routes
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Group, Post, User
+from posts.signals import (change_group_posts_count, change_posts_count,
+                           invalidate_feeds)
+
+
+def insert_posts(posts):
+    """Вставляет посты одним executemany с их pub_date.
+
+    bulk_create затёр бы pub_date текущим временем (auto_now_add).
+    Сигналы не вызываются: счётчики и ленты — на вызывающем.
+    """
+    adapt = connection.ops.adapt_datetimefield_value
+    table = connection.ops.quote_name(Post._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} '
+        f'(text, text_html, excerpt_html, image, pub_date, updated_at, '
+        f'author_id, group_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (post.text, post.text_html, post.excerpt_html,
+             post.image.name or '', adapt(post.pub_date),
+             adapt(post.pub_date), post.author_id, post.group_id)
+            for post in posts
+        ])
+
+
+def read_rows(stream, fmt):
+    """Пары (номер строки, строка-словарь)."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise CommandError(f'Строка {number}: {error}')
+        if not isinstance(row, dict):
+            raise CommandError(f'Строка {number}: ожидался объект JSON')
+        yield number, row
+
+
+def check_row(row):
+    """Текст ошибки строки или None, если поля годятся для поста."""
+    for field in ('text', 'author'):
+        value = row.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return f'Нужна непустая строка в {field}, получено {value!r}'
+    group = row.get('group')
+    if group is not None and not isinstance(group, str):
+        return f'Неверная группа {group!r}'
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает посты из JSONL или CSV (поля text, author, '
+        'group, pub_date) пачками многострочных INSERT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл с постами или «-» для stdin.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат входа; по умолчанию по расширению файла.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Строк в одной транзакции INSERT.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv')
+                                    else 'jsonl')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        if path == '-':
+            stream = io.TextIOWrapper(
+                sys.stdin.buffer, encoding='utf-8', newline='')
+            self.load(stream, fmt, options['batch_size'])
+            return
+        try:
+            with open(path, encoding='utf-8', newline='') as stream:
+                self.load(stream, fmt, options['batch_size'])
+        except OSError as error:
+            raise CommandError(error)
+
+    def load(self, stream, fmt, batch_size):
+        self.authors = {}
+        self.groups = {}
+        self.touched_authors = set()
+        self.touched_groups = set()
+        rows = read_rows(stream, fmt)
+        created = skipped = 0
+        started = time.monotonic()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            posts, errors = self.build(batch)
+            for error in errors:
+                self.stderr.write(error)
+            self.save(posts)
+            created += len(posts)
+            skipped += len(errors)
+            elapsed = time.monotonic() - started or 1e-9
+            self.stdout.write(
+                f'{created} постов, {created / elapsed:.0f} строк/с')
+        invalidate_feeds(self.touched_authors, self.touched_groups)
+        elapsed = time.monotonic() - started or 1e-9
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {created}, пропущено {skipped} за {elapsed:.1f} с '
+            f'({created / elapsed:.0f} строк/с)'
+        ))
+
+    def resolve(self, cache, model, field, keys):
+        missing = {key for key in keys if key and key not in cache}
+        if missing:
+            # Неизвестные имена тоже запоминаем, чтобы не искать их снова.
+            cache.update(dict.fromkeys(missing))
+            cache.update(
+                model.objects.filter(**{f'{field}__in': missing})
+                .values_list(field, 'pk')
+            )
+
+    def build(self, batch):
+        rows, errors = [], []
+        for number, row in batch:
+            error = check_row(row)
+            if error is None:
+                rows.append((number, row))
+            else:
+                errors.append(f'Строка {number}: {error}')
+        self.resolve(self.authors, User, 'username',
+                     {row['author'] for _, row in rows})
+        self.resolve(self.groups, Group, 'slug',
+                     {row.get('group') for _, row in rows})
+        posts = []
+        now = timezone.now()
+        for number, row in rows:
+            try:
+                post = self.build_post(row, now)
+            except ValueError as error:
+                errors.append(f'Строка {number}: {error}')
+                continue
+            posts.append(post)
+        return posts, errors
+
+    def build_post(self, row, now):
+        author_id = self.authors.get(row['author'])
+        if author_id is None:
+            raise ValueError(f"Нет автора {row['author']!r}")
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                raise ValueError(f"Нет группы {row['group']!r}")
+        pub_date = now
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(row['pub_date'])
+            except (TypeError, ValueError):
+                pub_date = None
+            if pub_date is None:
+                raise ValueError(f"Неверная дата {row['pub_date']!r}")
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        post = Post(
+            text=row['text'],
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+        )
+        # Вставка идёт мимо Post.save, HTML готовим сами.
+        post.render_text()
+        return post
+
+    @transaction.atomic
+    def save(self, posts):
+        insert_posts(posts)
+        per_author = Counter(post.author_id for post in posts)
+        per_group = Counter(post.group_id for post in posts)
+        for author_id, count in per_author.items():
+            change_posts_count(author_id, count)
+        for group_id, count in per_group.items():
+            change_group_posts_count(group_id, count)
+        self.touched_authors.update(per_author)
+        self.touched_groups.update(per_group)
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorStats, GroupStats, Post
+
+COUNTERS = (
+    ('Автор', AuthorStats, 'author'),
+    ('Группа', GroupStats, 'group'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и проверяет счётчики постов авторов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сравнить счётчики с реальными, ничего не меняя.',
+        )
+
+    def find_broken(self, model, field):
+        actual = dict(
+            Post.objects.order_by().filter(**{f'{field}__isnull': False})
+            .values_list(field).annotate(total=Count('pk'))
+        )
+        stored = dict(
+            model.objects.values_list(f'{field}_id', 'posts_count'))
+        return {
+            key: (stored.get(key), actual.get(key, 0))
+            for key in set(actual) | set(stored)
+            if stored.get(key) != actual.get(key, 0)
+        }
+
+    def handle(self, *args, **options):
+        broken = {}
+        for label, model, field in COUNTERS:
+            broken[model] = self.find_broken(model, field)
+            for key, (was, real) in sorted(broken[model].items()):
+                self.stdout.write(
+                    f'{label} {key}: в счётчике {was}, постов {real}')
+        total = sum(len(rows) for rows in broken.values())
+        if options['check']:
+            if total:
+                raise CommandError(f'Расходится счётчиков: {total}')
+            self.stdout.write(self.style.SUCCESS('Счётчики в порядке'))
+            return
+        with transaction.atomic():
+            for _, model, field in COUNTERS:
+                rows = broken[model]
+                model.objects.filter(**{f'{field}_id__in': rows}).delete()
+                model.objects.bulk_create(
+                    model(**{f'{field}_id': key, 'posts_count': real})
+                    for key, (_, real) in rows.items()
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {total}'))
@@ -0,0 +1,203 @@
+import random
+import time
+from datetime import timedelta
+from io import StringIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.fts import FTS_DROP_TRIGGERS, FTS_REBUILD, FTS_TRIGGERS
+from posts.models import Group, Post, User
+
+# Столько готовых фраз Faker хватает, чтобы тексты не повторялись
+# заметно, а генерация не зависела от числа постов.
+PHRASES = 2000
+
+# Тексты с готовым HTML собираются из фраз заранее: рендер каждого
+# поста заново стоил бы больше самой вставки.
+TEXTS = 20_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро генерирует пользователей, группы и посты для нагрузочного '
+        'тестирования: bulk_create и многострочные INSERT пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1000, help='Число пользователей.')
+        parser.add_argument(
+            '--groups', type=int, default=100, help='Число групп.')
+        parser.add_argument(
+            '--posts', type=int, default=100_000, help='Число постов.')
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='Глубина истории постов в днях.')
+        parser.add_argument(
+            '--password', default='yatube',
+            help='Пароль всех созданных пользователей.')
+        parser.add_argument(
+            '--batch-size', type=int, default=10_000,
+            help='Постов в одном executemany.')
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Зерно генератора для воспроизводимых данных.')
+
+    def handle(self, *args, **options):
+        for name in ('users', 'groups', 'posts'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} не может быть отрицательным')
+        if options['posts'] and not (
+                options['users'] or User.objects.exists()):
+            raise CommandError('Постам нужны авторы: задайте --users')
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--days и --batch-size должны быть больше 0')
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        started = time.monotonic()
+        with transaction.atomic():
+            self.create_users(options['users'], options['password'])
+            self.create_groups(options['groups'])
+            self.create_posts(
+                options['posts'], options['days'], options['batch_size'])
+        # Посты вставлены в обход сигналов: счётчики пересчитываем целиком,
+        # а закэшированные ленты сбрасываем.
+        call_command('rebuild_post_counters', stdout=StringIO())
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'))
+
+    def free_names(self, model, field, template, count):
+        """count свободных имён вида template.format(n) для поля field.
+
+        Нумерация идёт с числа строк в таблице, а занятые имена (прошлый
+        запуск, ручные записи) пропускаются: вставка не упадёт на
+        уникальности.
+        """
+        names = []
+        number = model.objects.count()
+        while len(names) < count:
+            candidates = [template.format(number + offset)
+                          for offset in range(count - len(names))]
+            number += len(candidates)
+            taken = set(model.objects.filter(
+                **{f'{field}__in': candidates}).values_list(field, flat=True))
+            names.extend(name for name in candidates if name not in taken)
+        return names
+
+    def create_users(self, count, password):
+        # Хэш пароля дорогой (PBKDF2), поэтому считаем его один раз.
+        password = make_password(password)
+        User.objects.bulk_create(
+            (User(
+                username=username,
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                email=f'{username}@example.com',
+                password=password,
+            ) for username in self.free_names(
+                User, 'username', 'user{}', count))
+        )
+        self.stdout.write(f'Пользователей: {count}')
+
+    def create_groups(self, count):
+        Group.objects.bulk_create(
+            (Group(
+                title=self.faker.catch_phrase()[:200],
+                slug=slug,
+                description=self.faker.paragraph(),
+            ) for slug in self.free_names(Group, 'slug', 'group-{}', count))
+        )
+        self.stdout.write(f'Групп: {count}')
+
+    def weighted(self, ids):
+        """Накопленные веса по закону Ципфа: есть и активные, и тихие."""
+        self.random.shuffle(ids)
+        return ids, list(
+            accumulate(1 / rank for rank in range(1, len(ids) + 1)))
+
+    def pub_dates(self, count, days):
+        """Возрастающие даты: пуассоновский поток за последние days дней.
+
+        Посты вставляются в хронологическом порядке, как на живом сайте,
+        поэтому id и pub_date растут вместе.
+        """
+        now = timezone.now()
+        moment = now - timedelta(days=days)
+        mean_gap = days * 86400 / max(count, 1)
+        for _ in range(count):
+            moment += timedelta(
+                seconds=self.random.expovariate(1 / mean_gap))
+            yield min(moment, now)
+
+    def texts(self, count):
+        """Тексты постов вместе с HTML, как их готовит Post.render_text."""
+        phrases = [self.faker.sentence() for _ in range(PHRASES)]
+        texts = []
+        for _ in range(count):
+            post = Post(text=' '.join(self.random.choices(
+                phrases, k=self.random.randint(1, 6))))
+            post.render_text()
+            texts.append((post.text, post.text_html, post.excerpt_html))
+        return texts
+
+    def create_posts(self, count, days, batch_size):
+        if not count:
+            return
+        authors, author_weights = self.weighted(
+            list(User.objects.values_list('pk', flat=True)))
+        groups, group_weights = self.weighted(
+            list(Group.objects.values_list('pk', flat=True)))
+        texts = self.texts(min(count, TEXTS))
+        adapt = connection.ops.adapt_datetimefield_value
+        table = connection.ops.quote_name(Post._meta.db_table)
+        sql = (
+            f'INSERT INTO {table} '
+            f'(text, text_html, excerpt_html, image, pub_date, updated_at, '
+            f"author_id, group_id) VALUES (%s, %s, %s, '', %s, %s, %s, %s)"
+        )
+        dates = self.pub_dates(count, days)
+        started = time.monotonic()
+        done = 0
+        fts = connection.vendor == 'sqlite'
+        with connection.cursor() as cursor:
+            if fts:
+                # Построчные триггеры FTS вдвое замедляют вставку; один
+                # rebuild в конце обходится дешевле.
+                for statement in FTS_DROP_TRIGGERS:
+                    cursor.execute(statement)
+            while done < count:
+                size = min(batch_size, count - done)
+                author_ids = self.random.choices(
+                    authors, cum_weights=author_weights, k=size)
+                group_ids = self.random.choices(
+                    groups, cum_weights=group_weights, k=size) if groups \
+                    else [None] * size
+                rows = []
+                for author_id, group_id in zip(author_ids, group_ids):
+                    pub_date = adapt(next(dates))
+                    text, text_html, excerpt_html = self.random.choice(texts)
+                    # Примерно треть постов публикуется вне групп.
+                    if self.random.random() < 0.3:
+                        group_id = None
+                    rows.append((
+                        text, text_html, excerpt_html,
+                        pub_date, pub_date, author_id, group_id,
+                    ))
+                cursor.executemany(sql, rows)
+                done += size
+                elapsed = time.monotonic() - started or 1e-9
+                self.stdout.write(
+                    f'{done} постов, {done / elapsed:.0f} строк/с')
+            if fts:
+                self.stdout.write('Переиндексация поиска…')
+                for statement in FTS_TRIGGERS + (FTS_REBUILD,):
+                    cursor.execute(statement)
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.6 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.db.models import F
+
+from posts.fts import install_fts
+
+
+def copy_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(updated_at=F('pub_date'))
+
+
+def reinstall_fts(apps, schema_editor):
+    # AddField в SQLite пересоздаёт posts_post вместе с триггерами.
+    install_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 2.2.6 on 2026-10-18 22:10
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+from posts.fts import install_fts
+
+EXCERPT_LENGTH = 300
+
+
+def render_texts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.only('text').iterator(chunk_size=2000):
+        post.text_html = linebreaks(post.text, autoescape=True)
+        post.excerpt_html = linebreaks(
+            Truncator(post.text).chars(EXCERPT_LENGTH), autoescape=True)
+        batch.append(post)
+        if len(batch) == 2000:
+            Post.objects.bulk_update(batch, ('text_html', 'excerpt_html'))
+            batch = []
+    Post.objects.bulk_update(batch, ('text_html', 'excerpt_html'))
+
+
+def reinstall_fts(apps, schema_editor):
+    # AddField в SQLite пересоздаёт posts_post вместе с триггерами.
+    install_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_groupstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(default='', editable=False, verbose_name='Анонс поста, HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='Текст поста, HTML'),
+        ),
+        migrations.RunPython(render_texts, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+    ]
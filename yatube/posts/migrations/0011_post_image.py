@@ -0,0 +1,26 @@
+# Generated by Django 2.2.6 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+from posts.fts import install_fts
+
+
+def reinstall_fts(apps, schema_editor):
+    # AddField в SQLite пересоздаёт posts_post вместе с триггерами.
+    install_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_text_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,24 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+# Длина анонса поста в лентах, символов.
+EXCERPT_LENGTH = 300
+
 
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст поста')
+    text_html = models.TextField(
+        default='', editable=False, verbose_name='Текст поста, HTML')
+    excerpt_html = models.TextField(
+        default='', editable=False, verbose_name='Анонс поста, HTML')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Дата изменения')
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -22,15 +33,43 @@ class Post(models.Model):
         related_name='posts',
         verbose_name='Группа',
     )
+    image = models.ImageField(
+        upload_to='posts/',
+        blank=True,
+        verbose_name='Картинка',
+    )
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date', 'author',)
+        indexes = (
+            models.Index(fields=('-pub_date', 'author'),
+                         name='post_pub_date_author_idx'),
+            models.Index(fields=('group', '-pub_date', 'author'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('author', '-pub_date'),
+                         name='post_author_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text[:30]
 
+    def render_text(self):
+        """Экранированный HTML с абзацами для поста и его анонса."""
+        self.text_html = linebreaks(self.text, autoescape=True)
+        self.excerpt_html = linebreaks(
+            Truncator(self.text).chars(EXCERPT_LENGTH), autoescape=True)
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.render_text()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {
+                    *update_fields, 'text_html', 'excerpt_html'}
+        super().save(*args, **kwargs)
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Создание группы')
@@ -43,3 +82,41 @@ class Group(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0, verbose_name='Число постов')
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0, verbose_name='Число постов')
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+    def __str__(self):
+        return f'{self.group_id}: {self.posts_count}'
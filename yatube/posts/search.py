@@ -0,0 +1,94 @@
+import base64
+import binascii
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .fts import FTS_TABLE
+from .models import Post
+
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_TOKENS = 24
+
+
+def fts_query(text):
+    """Строка пользователя как FTS5-запрос: все слова, без операторов."""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def encode_cursor(rank, pk):
+    raw = f'{rank!r}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        rank, pk = raw.decode().split('|')
+        return float(rank), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def search_posts(text, limit, after=None):
+    """Посты по релевантности (bm25) c подсветкой и keyset-пагинацией.
+
+    Возвращает список постов с атрибутами snippet и rank и токен
+    следующей страницы или None.
+    """
+    query = fts_query(text)
+    if not query:
+        return [], None
+    sql = (
+        f"SELECT rowid, rank, snippet({FTS_TABLE}, 0, %s, %s, '…', %s) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+    )
+    params = [MARK_START, MARK_END, SNIPPET_TOKENS, query]
+    cursor = decode_cursor(after) if after else None
+    if cursor is not None:
+        sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+        params += [cursor[0], cursor[0], cursor[1]]
+    sql += ' ORDER BY rank, rowid LIMIT %s'
+    params.append(limit + 1)
+    with connection.cursor() as db:
+        db.execute(sql, params)
+        rows = db.fetchall()
+    found = Post.objects.select_related('author', 'group').in_bulk(
+        [pk for pk, _, _ in rows[:limit]])
+    posts = []
+    for pk, rank, snippet in rows[:limit]:
+        post = found.get(pk)
+        if post is None:
+            continue
+        post.rank = rank
+        post.snippet = highlight(snippet)
+        posts.append(post)
+    next_cursor = None
+    if len(rows) > limit:
+        pk, rank, _ = rows[limit - 1]
+        next_cursor = encode_cursor(rank, pk)
+    return posts, next_cursor
+
+
+def matching_posts(queryset, text):
+    """Фильтр queryset по полнотекстовому индексу вместо LIKE '%...%'."""
+    query = fts_query(text)
+    if not query:
+        return queryset.none()
+    return queryset.extra(
+        where=[
+            f'"posts_post"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[query],
+    )
@@ -0,0 +1,216 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import DEFERRED, F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .cache import INDEX_FEED, author_feed, bump_feed_versions, group_feed
+from .loaders import forget
+from .models import AuthorStats, Group, GroupStats, Post, User
+from .thumbnails import schedule
+
+
+def change_stats(model, field, key, delta):
+    """Атомарно сдвигает счётчик постов на delta через F()."""
+    if key is None:
+        return
+    stats = model.objects.filter(**{field: key})
+    if delta < 0:
+        stats.filter(posts_count__gte=-delta).update(
+            posts_count=F('posts_count') + delta)
+        return
+    if stats.update(posts_count=F('posts_count') + delta):
+        return
+    # Строки ещё нет: заводим её сразу с честным значением.
+    _, created = model.objects.get_or_create(
+        **{field: key},
+        defaults={'posts_count': Post.objects.filter(**{field: key}).count()},
+    )
+    if not created:
+        stats.update(posts_count=F('posts_count') + delta)
+
+
+def change_posts_count(author_id, delta):
+    change_stats(AuthorStats, 'author_id', author_id, delta)
+
+
+def change_group_posts_count(group_id, delta):
+    change_stats(GroupStats, 'group_id', group_id, delta)
+
+
+def invalidate_feeds(author_ids, group_ids):
+    """Сбрасывает закэшированные блоки лент, где виден пост, и
+    закэшированных автора и группу вместе с их счётчиками."""
+    usernames = list(User.objects.filter(
+        pk__in=author_ids - {None}).values_list('username', flat=True))
+    group_ids = group_ids - {None}
+    slugs = list(Group.objects.filter(
+        pk__in=group_ids).values_list('slug', flat=True)) if group_ids else []
+    forget(slugs=slugs, usernames=usernames)
+    bump_feed_versions(
+        [INDEX_FEED]
+        + [author_feed(username) for username in usernames]
+        + [group_feed(slug) for slug in slugs]
+    )
+
+
+def remember(instance, fields):
+    """Запоминает загруженные значения полей для сравнения при записи.
+
+    Читает только __dict__: обращение к отложенному (only/defer) полю
+    перечитало бы его из базы, создав ещё один экземпляр с post_init.
+    Такие поля помечаются DEFERRED и дочитываются в load_deferred.
+    """
+    instance._loaded = {
+        field: instance.__dict__.get(field, DEFERRED) for field in fields}
+
+
+def load_deferred(sender, instance):
+    """Перед записью или удалением дочитывает отложенные старые значения."""
+    missing = [field for field, value in instance._loaded.items()
+               if value is DEFERRED]
+    if not missing:
+        return
+    row = {}
+    if not instance._state.adding:
+        row = sender._base_manager.filter(pk=instance.pk).values(
+            *missing).first() or {}
+    instance._loaded.update({field: row.get(field) for field in missing})
+
+
+def current(instance, field):
+    """Значение поля после записи; не загруженное поле не менялось."""
+    return instance.__dict__.get(field, instance._loaded[field])
+
+
+# Поля поста, от которых зависят счётчики и сброс лент.
+POST_TRACKED_FIELDS = ('author_id', 'group_id')
+
+
+@receiver(post_init, sender=Post)
+def remember_loaded_state(sender, instance, **kwargs):
+    remember(instance, POST_TRACKED_FIELDS)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def load_post_state(sender, instance, **kwargs):
+    load_deferred(sender, instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    old_author_id = instance._loaded['author_id']
+    old_group_id = instance._loaded['group_id']
+    author_id = current(instance, 'author_id')
+    group_id = current(instance, 'group_id')
+    instance._loaded = {'author_id': author_id, 'group_id': group_id}
+    if created:
+        change_posts_count(author_id, 1)
+        change_group_posts_count(group_id, 1)
+    else:
+        with transaction.atomic():
+            if old_author_id != author_id:
+                change_posts_count(old_author_id, -1)
+                change_posts_count(author_id, 1)
+            if old_group_id != group_id:
+                change_group_posts_count(old_group_id, -1)
+                change_group_posts_count(group_id, 1)
+    invalidate_feeds({old_author_id, author_id}, {old_group_id, group_id})
+    # Новые миниатюры появятся в лентах после сброса их кэша.
+    if 'image' in instance.__dict__:
+        schedule(instance.image, on_ready=partial(
+            invalidate_feeds, {author_id}, {group_id}))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    author_id = current(instance, 'author_id')
+    group_id = current(instance, 'group_id')
+    change_posts_count(author_id, -1)
+    change_group_posts_count(group_id, -1)
+    invalidate_feeds({author_id}, {group_id})
+
+
+def group_authors(group):
+    return set(User.objects.filter(posts__group=group).distinct()
+               .values_list('username', flat=True))
+
+
+@receiver(post_init, sender=Group)
+def remember_group_slug(sender, instance, **kwargs):
+    remember(instance, ('slug',))
+
+
+@receiver(pre_save, sender=Group)
+def load_group_state(sender, instance, **kwargs):
+    load_deferred(sender, instance)
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_authors(sender, instance, **kwargs):
+    load_deferred(sender, instance)
+    # После удаления у постов group обнулён без сигналов, и по ним
+    # уже не найти профили, где была ссылка на группу.
+    instance._authors = group_authors(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, signal, **kwargs):
+    old_slug = instance._loaded['slug']
+    slug = current(instance, 'slug')
+    feeds = {INDEX_FEED, group_feed(old_slug), group_feed(slug)}
+    if signal is post_delete:
+        usernames = instance._authors
+    elif old_slug != slug:
+        # Ссылка на группу есть и в профилях её авторов.
+        usernames = group_authors(instance)
+    else:
+        usernames = set()
+    feeds.update(author_feed(username) for username in usernames)
+    forget(slugs={old_slug, slug})
+    bump_feed_versions(feeds)
+    instance._loaded = {'slug': slug}
+
+
+# Поля автора, которые видны в лентах и на странице поста.
+AUTHOR_DISPLAY_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    remember(instance, AUTHOR_DISPLAY_FIELDS)
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_delete, sender=User)
+def load_author_state(sender, instance, update_fields=None, **kwargs):
+    # Вход сохраняет только last_login: имена дочитывать незачем.
+    if update_fields is None or set(update_fields) & set(
+            AUTHOR_DISPLAY_FIELDS):
+        load_deferred(sender, instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def author_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(
+            AUTHOR_DISPLAY_FIELDS):
+        return
+    old = instance._loaded
+    new = {field: current(instance, field) for field in old}
+    instance._loaded = new
+    forget(usernames={old['username'], new['username']})
+    # Ленты сбрасываем, только если поменялось имя, которое в них видно.
+    if old != new:
+        slugs = set(Group.objects.filter(posts__author=instance).distinct()
+                    .values_list('slug', flat=True))
+        bump_feed_versions(
+            {INDEX_FEED,
+             author_feed(old['username']),
+             author_feed(new['username'])}
+            | {group_feed(slug) for slug in slugs}
+        )
@@ -0,0 +1,62 @@
+"""Потоковый рендер лент.
+
+Страница рендерится без постов, с меткой на их месте: всё до метки
+уходит клиенту сразу, затем посты выбираются из базы и отдаются по
+одному, и в конце — остаток страницы.
+"""
+import contextvars
+import uuid
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+
+from . import thumbnails
+
+
+def in_request_context(chunks):
+    """Выполняет генератор в контексте вью.
+
+    Поток дочитывается уже после middleware; без копии контекста посты
+    выбирались бы мимо реплики (core.routers.use_replica). Копия
+    снимается сразу при вызове, а не на первом куске потока.
+    """
+    return run_in(contextvars.copy_context(), iter(chunks))
+
+
+def run_in(context, chunks):
+    while True:
+        try:
+            yield context.run(next, chunks)
+        except StopIteration:
+            return
+
+
+def feed_rows(head, tail, context, row_template):
+    yield head
+    row = get_template(row_template)
+    posts = list(context['page_obj'])
+    thumbnails.prefetch(posts, 'feed')
+    for number, post in enumerate(posts, 1):
+        yield row.render(
+            {**context, 'post': post, 'last': number == len(posts)})
+    yield tail
+
+
+def render_feed(request, template_name, context, row_template):
+    """render() для ленты, а при FEED_STREAMING — потоковый ответ.
+
+    Шаблон ленты выводит {{ feed_rows }} вместо цикла по постам, если
+    эта переменная задана; row_template рисует один пост. Миниатюры
+    постов страницы ищутся разом (thumbnails.prefetch).
+    """
+    if not settings.FEED_STREAMING:
+        thumbnails.prefetch(context['page_obj'], 'feed')
+        return render(request, template_name, context)
+    marker = f'feed-rows-{uuid.uuid4().hex}'
+    page = render_to_string(
+        template_name, {**context, 'feed_rows': marker}, request)
+    head, tail = page.split(marker, 1)
+    return StreamingHttpResponse(in_request_context(
+        feed_rows(head, tail, context, row_template)))
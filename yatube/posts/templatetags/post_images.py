@@ -0,0 +1,26 @@
+from django import template
+
+from ..thumbnails import lookup, pool, schedule
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(post, size):
+    """{% post_thumbnail post 'feed' as thumbnail %}
+
+    Готовая миниатюра размера из POST_THUMBNAILS или None. Берёт
+    найденную thumbnails.prefetch, иначе ищет сама. Картинку не режет:
+    на промахе ставит миниатюры в очередь пула, если он есть.
+    """
+    image = post.image
+    if not image:
+        return None
+    prefetched = getattr(post, 'thumbnails', {})
+    if size in prefetched:
+        thumbnail = prefetched[size]
+    else:
+        thumbnail = lookup(image, size)
+    if thumbnail is None and pool.enabled():
+        schedule(image)
+    return thumbnail
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, User
+
+
+class AuthCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='cached', password='old-password-123')
+        Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.login(
+            username='cached', password='old-password-123')
+
+    def auth_queries(self, client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in queries
+            if '"django_session"' in query['sql']
+            or 'FROM "auth_user"' in query['sql']
+        ]
+
+    def test_warm_cache_skips_session_and_user(self):
+        """С прогретым кэшем лента не читает сессию и пользователя."""
+        self.auth_queries(self.authorized_client)
+        self.assertEqual(self.auth_queries(self.authorized_client), [])
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions(self):
+        """Сессия в подписанной cookie не требует запросов к базе."""
+        client = Client()
+        client.login(username='cached', password='old-password-123')
+        self.auth_queries(client)
+        self.assertEqual(self.auth_queries(client), [])
+        response = client.get(reverse('posts:create'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_change_invalidates_cache(self):
+        """Смена пароля сбрасывает кэш: другие сессии разлогиниваются."""
+        other_client = Client()
+        other_client.login(username='cached', password='old-password-123')
+        self.auth_queries(other_client)
+        response = self.authorized_client.post(
+            reverse('users:password_change_form'),
+            {
+                'old_password': 'old-password-123',
+                'new_password1': 'new-password-456',
+                'new_password2': 'new-password-456',
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        response = other_client.get(reverse('posts:create'))
+        self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.get(reverse('posts:create'))
+        self.assertEqual(response.status_code, 200)
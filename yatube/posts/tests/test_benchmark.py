@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import urls
+from ..models import AuthorStats, Group, Post, User
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_benchmark_reports_every_route(self):
+        """Замер досевает данные и пишет метрики всех маршрутов в JSON."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            call_command(
+                'benchmark_posts', '--use-current-db',
+                posts=[30, 60], groups=3, authors=4, requests=2,
+                output=output, stdout=StringIO(),
+            )
+            with open(output, encoding='utf-8') as file:
+                report = json.load(file)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 4)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            60,
+        )
+        self.assertEqual([run['posts'] for run in report['runs']], [30, 60])
+        names = {pattern.name for pattern in urls.urlpatterns}
+        for run in report['runs']:
+            self.assertEqual(set(run['routes']), names)
+            for name, modes in run['routes'].items():
+                for mode in ('cold', 'warm'):
+                    with self.subTest(name=name, mode=mode):
+                        self.assertEqual(modes[mode]['statuses'], [200])
+                        self.assertIn('p99', modes[mode]['latency_ms'])
+                        self.assertIn('p99', modes[mode]['ttfb_ms'])
+                        self.assertIn('mean', modes[mode]['sql_ms'])
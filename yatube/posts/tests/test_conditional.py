@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='etag')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='etag-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Текст', author=self.user, group=self.group)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.feed_urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'etag'}),
+        )
+        self.detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk})
+
+    def test_unchanged_pages_return_304(self):
+        """Неизменённая страница отдаёт 304 по ETag и Last-Modified."""
+        for url in self.feed_urls + (self.detail_url,):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertEqual(self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+                self.assertEqual(self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                ).status_code, 304)
+
+    def test_304_skips_rendering(self):
+        """Ответ 304 для ленты не обращается к базе."""
+        etag = self.client.get(self.feed_urls[0])['ETag']
+        with self.assertNumQueries(0):
+            self.client.get(self.feed_urls[0], HTTP_IF_NONE_MATCH=etag)
+
+    def test_write_changes_etag(self):
+        """Правка поста меняет ETag ленты и страницы поста."""
+        etags = {
+            url: self.client.get(url)['ETag']
+            for url in self.feed_urls + (self.detail_url,)
+        }
+        self.post.text = 'Новый текст'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        """Гость и автор получают разные ETag одной страницы."""
+        for url in self.feed_urls + (self.detail_url,):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_author_and_group_changes_reach_pages(self):
+        """Новое имя автора и название группы видны везде, без 304."""
+        urls = self.feed_urls[:2] + (self.detail_url,)
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        self.user.first_name = 'Переименованный'
+        self.user.save()
+        self.group.title = 'Новое название'
+        self.group.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Переименованный')
+        self.assertContains(self.client.get(self.detail_url),
+                            'Новое название')
+
+    def test_login_keeps_feeds_cached(self):
+        """Вход (запись last_login) не сбрасывает ленты."""
+        self.user.set_password('secret-password')
+        self.user.save()
+        guest = Client()
+        etag = guest.get(self.feed_urls[0])['ETag']
+        self.assertTrue(
+            self.client.login(username='etag', password='secret-password'))
+        self.assertEqual(guest.get(
+            self.feed_urls[0], HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -0,0 +1,122 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import AuthorStats, Group, GroupStats, Post, User
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='writer')
+        cls.other = User.objects.create_user(username='other')
+
+    def posts_count(self, user):
+        return AuthorStats.objects.get(author=user).posts_count
+
+    def test_create_and_delete_update_counter(self):
+        """Создание и удаление поста меняют счётчик автора."""
+        first = Post.objects.create(text='Первый', author=self.user)
+        Post.objects.create(text='Второй', author=self.user)
+        self.assertEqual(self.posts_count(self.user), 2)
+        first.delete()
+        self.assertEqual(self.posts_count(self.user), 1)
+
+    def test_author_reassignment_moves_post(self):
+        """Смена автора переносит пост между счётчиками."""
+        post = Post.objects.create(text='Пост', author=self.user)
+        post.author = self.other
+        post.save()
+        post.save()
+        self.assertEqual(self.posts_count(self.user), 0)
+        self.assertEqual(self.posts_count(self.other), 1)
+
+    def test_post_detail_reads_counter(self):
+        """Страница поста берёт число постов из счётчика без COUNT(*)."""
+        post = Post.objects.create(text='Пост', author=self.user)
+        Post.objects.create(text='Ещё пост', author=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertFalse(
+            [query for query in queries if 'COUNT(' in query['sql']])
+        self.assertContains(response, '<span >2</span>', html=False)
+
+    def test_post_detail_without_stats_row(self):
+        """Без строки счётчика страница поста показывает 0, а не пусто."""
+        post = Post.objects.create(text='Пост', author=self.user)
+        AuthorStats.objects.filter(author=self.user).delete()
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertContains(response, '<span >0</span>', html=False)
+
+    def test_rebuild_command(self):
+        """Команда находит и исправляет расхождения счётчиков."""
+        Post.objects.create(text='Пост', author=self.user)
+        AuthorStats.objects.filter(author=self.user).update(posts_count=7)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counters', check=True,
+                         stdout=StringIO())
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(self.posts_count(self.user), 1)
+        call_command('rebuild_post_counters', check=True, stdout=StringIO())
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='grouper')
+        cls.group = Group.objects.create(
+            title='Первая группа', slug='first', description='Описание')
+        cls.other = Group.objects.create(
+            title='Вторая группа', slug='second', description='Описание')
+
+    def posts_count(self, group):
+        return GroupStats.objects.get(group=group).posts_count
+
+    def test_group_counter_follows_posts(self):
+        """Создание, перенос и удаление поста меняют счётчики групп."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group)
+        Post.objects.create(text='Ещё пост', author=self.user)
+        self.assertEqual(self.posts_count(self.group), 1)
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.posts_count(self.group), 0)
+        self.assertEqual(self.posts_count(self.other), 1)
+        post.delete()
+        self.assertEqual(self.posts_count(self.other), 0)
+
+    def test_rebuild_command_fixes_groups(self):
+        """Команда пересчёта исправляет и счётчики групп."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        GroupStats.objects.filter(group=self.group).update(posts_count=9)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counters', check=True,
+                         stdout=StringIO())
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(self.posts_count(self.group), 1)
+
+    def test_deferred_posts_load_and_save(self):
+        """Посты с only/defer читаются, переносятся и удаляются."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        self.assertEqual(Post.objects.only('text').get().text, 'Пост')
+        self.assertEqual(
+            Post.objects.defer('author', 'group').get().text, 'Пост')
+        # Загрузка не дочитывает отложенные поля по одному.
+        with self.assertNumQueries(1):
+            list(Post.objects.only('text'))
+        post = Post.objects.only('text').get()
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.posts_count(self.group), 0)
+        self.assertEqual(self.posts_count(self.other), 1)
+        Post.objects.only('text').get().delete()
+        self.assertEqual(self.posts_count(self.other), 0)
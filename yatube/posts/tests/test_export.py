@@ -0,0 +1,60 @@
+import csv
+import json
+from io import StringIO
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='exporter')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='export-slug',
+            description='Тестовое описание',
+        )
+        for number in range(3):
+            Post.objects.create(
+                text=f'Пост №{number}, "с кавычками"',
+                author=cls.user,
+                group=cls.group if number else None,
+            )
+
+    def get_content(self, url, fmt):
+        response = self.client.get(url, {'format': fmt})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_profile_csv(self):
+        """CSV профиля содержит все посты автора."""
+        content = self.get_content(
+            reverse('posts:profile_export',
+                    kwargs={'username': 'exporter'}),
+            'csv',
+        )
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['author'], 'exporter')
+        self.assertEqual(rows[-1]['text'], 'Пост №0, "с кавычками"')
+
+    def test_group_jsonl(self):
+        """JSONL группы содержит только посты группы."""
+        content = self.get_content(
+            reverse('posts:group_export', kwargs={'slug': 'export-slug'}),
+            'jsonl',
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(row['group'] == 'export-slug' for row in rows))
+
+    def test_unknown_feed_is_404(self):
+        """Выгрузка несуществующей группы отдаёт 404."""
+        response = self.client.get(
+            reverse('posts:group_export', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.templatetags.fragment_cache import fragment_cache_stats
+from ..models import Group, Post, User
+
+
+class FragmentCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cached')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='cached-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Исходный текст',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_list_block_served_from_cache(self):
+        """Повторный показ ленты берёт список постов из кэша."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.authorized_client.get(url)
+                name = url.strip('/').split('/')[0] or 'index'
+                with CaptureQueriesContext(connection) as queries:
+                    self.authorized_client.get(url)
+                self.assertFalse([
+                    query for query in queries
+                    if '"posts_post"."text"' in query['sql']
+                ])
+                stats = fragment_cache_stats()[f'{name}_list']
+                self.assertEqual(stats, {'hit': 1, 'miss': 1})
+
+    def test_edit_invalidates_feeds(self):
+        """Правка поста сразу видна во всех лентах."""
+        for url in self.urls:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': 'Новый текст', 'group': self.group.pk},
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Новый текст')
+                self.assertNotContains(response, 'Исходный текст')
+
+    def test_create_and_delete_invalidate_feeds(self):
+        """Новый и удалённый посты сразу отражаются в лентах."""
+        for url in self.urls:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:create'),
+            {'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Свежий пост')
+        Post.objects.get(text='Свежий пост').delete()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotContains(self.client.get(url), 'Свежий пост')
+
+    def test_moved_post_leaves_old_group(self):
+        """Перенос поста в другую группу убирает его из старой."""
+        url = self.urls[1]
+        self.assertContains(self.client.get(url), 'Исходный текст')
+        other = Group.objects.create(
+            title='Другая группа', slug='other-slug', description='Текст')
+        self.post.group = other
+        self.post.save()
+        self.assertNotContains(self.client.get(url), 'Исходный текст')
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..models import AuthorStats, Group, Post, User
+from ..search import search_posts
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='importer')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='import-slug',
+            description='Тестовое описание',
+        )
+
+    def import_file(self, suffix, content, **options):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, delete=False, encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.unlink, file.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', file.name, stdout=out, stderr=err,
+                     **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_jsonl_import(self):
+        """JSONL грузится пачками, авторы и группы ищутся по имени."""
+        rows = [
+            {'text': f'Импорт №{number}', 'author': 'importer',
+             'group': 'import-slug' if number % 2 else '',
+             'pub_date': f'2020-01-{number + 1:02d}T10:00:00+00:00'}
+            for number in range(5)
+        ]
+        rows.append({'text': 'Чужой', 'author': 'nobody'})
+        out, err = self.import_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows),
+            batch_size=2)
+        self.assertIn('Загружено 5, пропущено 1', out)
+        self.assertIn("Нет автора 'nobody'", err)
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(self.group.posts.count(), 2)
+        self.assertEqual(
+            sorted(Post.objects.values_list('pub_date__day', flat=True)),
+            [1, 2, 3, 4, 5])
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, 5)
+        self.assertEqual(len(search_posts('Импорт', 10)[0]), 5)
+
+    def test_csv_import(self):
+        """CSV с заголовком загружается так же."""
+        out, _ = self.import_file(
+            '.csv',
+            'text,author,group\n'
+            '"Первый, с запятой",importer,import-slug\n'
+            'Второй,importer,\n',
+        )
+        self.assertIn('Загружено 2', out)
+        self.assertTrue(
+            Post.objects.filter(text='Первый, с запятой',
+                                group=self.group).exists())
+
+    def test_bad_dates_skipped(self):
+        """Неразборчивая или невозможная дата — ошибка строки."""
+        rows = [
+            {'text': 'Мусор', 'author': 'importer', 'pub_date': 'garbage'},
+            {'text': 'Месяц', 'author': 'importer',
+             'pub_date': '2020-13-01T10:00:00'},
+            {'text': 'Без даты', 'author': 'importer'},
+        ]
+        out, err = self.import_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        self.assertIn('Загружено 1, пропущено 2', out)
+        self.assertIn("Неверная дата 'garbage'", err)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Без даты'])
+
+    def test_non_object_line_rejected(self):
+        """Строка JSONL не с объектом — ошибка с номером строки."""
+        with self.assertRaisesMessage(CommandError, 'Строка 2'):
+            self.import_file(
+                '.jsonl', '{"text": "Пост", "author": "importer"}\n[1, 2]')
+
+    def test_bad_fields_reported_by_line(self):
+        """Пустой текст и поля не-строки — ошибки с номером строки."""
+        rows = [
+            {'text': '', 'author': 'importer'},
+            {'text': 'Автор-список', 'author': ['importer']},
+            {'text': 'Группа-объект', 'author': 'importer',
+             'group': {'slug': 'import-slug'}},
+            {'text': 'Годный', 'author': 'importer', 'group': 'import-slug'},
+        ]
+        out, err = self.import_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        self.assertIn('Загружено 1, пропущено 3', out)
+        for number in (1, 2, 3):
+            self.assertIn(f'Строка {number}:', err)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Годный'])
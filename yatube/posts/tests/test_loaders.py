@@ -0,0 +1,107 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class FeedLoadersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='loader')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.group = Group.objects.create(
+            title='Старое название', slug='loader', description='Описание')
+        for number in range(3):
+            Post.objects.create(
+                text=f'Пост №{number}', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries]
+
+    def test_warm_loaders_skip_lookup(self):
+        """С прогретым кэшем группа и автор не читаются из базы."""
+        for url, table in (
+            (reverse('posts:group_list', kwargs={'slug': 'loader'}),
+             'FROM "posts_group"'),
+            (reverse('posts:profile', kwargs={'username': 'loader'}),
+             'FROM "auth_user"'),
+        ):
+            with self.subTest(url=url):
+                self.queries(url)
+                warm = self.queries(url, {'page': 2})
+                self.assertFalse([sql for sql in warm if table in sql])
+
+    def test_posts_filtered_by_pk(self):
+        """Посты профиля выбираются по id автора, без JOIN на auth_user."""
+        url = reverse('posts:profile', kwargs={'username': 'loader'})
+        post_queries = [
+            sql for sql in self.queries(url) if 'FROM "posts_post"' in sql]
+        self.assertTrue(post_queries)
+        for sql in post_queries:
+            self.assertNotIn('JOIN "auth_user"', sql)
+            self.assertIn('"posts_post"."author_id" =', sql)
+
+    def test_admin_edit_invalidates_group(self):
+        """Правка группы в админке сразу видна на её странице."""
+        url = reverse('posts:group_list', kwargs={'slug': 'loader'})
+        self.assertContains(self.authorized_client.get(url), 'Старое название')
+        response = self.admin_client.post(
+            reverse('admin:posts_group_change', args=(self.group.pk,)),
+            {'title': 'Новое название', 'slug': 'loader',
+             'description': 'Описание'},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self.authorized_client.get(url), 'Новое название')
+
+    def test_new_post_refreshes_cached_counter(self):
+        """Новый пост обновляет счётчик закэшированного автора."""
+        url = reverse('posts:profile', kwargs={'username': 'loader'})
+        self.assertContains(self.authorized_client.get(url), 'Всего постов: 3')
+        Post.objects.create(text='Ещё пост', author=self.user)
+        self.assertContains(self.authorized_client.get(url), 'Всего постов: 4')
+
+    def test_unknown_slug_is_404(self):
+        """Несуществующая группа и автор дают 404."""
+        for url in (
+            reverse('posts:group_list', kwargs={'slug': 'nope'}),
+            reverse('posts:profile', kwargs={'username': 'nope'}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.authorized_client.get(url).status_code, 404)
+
+    def test_deferred_author_and_group(self):
+        """Автор и группа с only/defer читаются и переименовываются."""
+        self.assertEqual(User.objects.only('pk').get(pk=self.user.pk).pk,
+                         self.user.pk)
+        self.assertEqual(
+            User.objects.defer('first_name').get(pk=self.user.pk).username,
+            'loader')
+        self.assertEqual(Group.objects.only('title').get().title,
+                         'Старое название')
+        url = reverse('posts:profile', kwargs={'username': 'loader'})
+        self.authorized_client.get(url)
+        author = User.objects.only('pk').get(pk=self.user.pk)
+        author.first_name = 'Отложенный'
+        author.save(update_fields=('first_name',))
+        self.assertContains(self.authorized_client.get(url), 'Отложенный')
+        group = Group.objects.only('title').get()
+        group.slug = 'renamed'
+        group.save()
+        self.assertEqual(self.authorized_client.get(reverse(
+            'posts:group_list', kwargs={'slug': 'loader'})).status_code, 404)
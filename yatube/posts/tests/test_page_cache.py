@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='page-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-page-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(text='Пост', author=cls.user, group=cls.group)
+        Post.objects.create(
+            text='Чужой пост', author=cls.other, group=cls.other_group)
+        cls.index_url = reverse('posts:index')
+        cls.group_url = reverse(
+            'posts:group_list', kwargs={'slug': cls.group.slug})
+        cls.other_group_url = reverse(
+            'posts:group_list', kwargs={'slug': cls.other_group.slug})
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.user.username})
+        cls.other_profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.other.username})
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_page_skips_database(self):
+        """Повторная страница ленты для гостя отдаётся без запросов."""
+        for url in (self.index_url, self.group_url, self.profile_url):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.content, first.content)
+
+    def test_authorized_page_not_cached(self):
+        """Авторизованный пользователь всегда получает свежую страницу."""
+        self.authorized_client.get(self.index_url)
+        response = self.authorized_client.get(self.index_url)
+        self.assertIn('page_obj', response.context)
+
+    def test_new_post_invalidates_only_its_feeds(self):
+        """Новый пост сбрасывает только ленты своего автора и группы."""
+        urls = (
+            self.index_url,
+            self.group_url,
+            self.profile_url,
+            self.other_group_url,
+            self.other_profile_url,
+        )
+        for url in urls:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:create'),
+            {'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for url in urls[:3]:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Свежий пост')
+        for url in urls[3:]:
+            with self.subTest(url=url):
+                with self.assertNumQueries(0):
+                    self.client.get(url)
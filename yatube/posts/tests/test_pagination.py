@@ -0,0 +1,224 @@
+import base64
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..utils import (CURSOR_ORDERING, PAGE_ELLIPSIS, CountedPaginator,
+                     CursorPage, bounded_count, decode_cursor,
+                     elided_page_range, encode_cursor, get_page_context)
+
+
+class CursorPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cursor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='cursor-slug',
+            description='Тестовое описание',
+        )
+        for number in range(settings.POSTS_ON_PAGE * 2 + 5):
+            Post.objects.create(
+                text=f'Пост №{number}',
+                author=cls.user,
+                group=cls.group,
+            )
+        cls.expected = list(
+            Post.objects.order_by(*CURSOR_ORDERING).values_list(
+                'pk', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url):
+        seen = []
+        response = self.client.get(url + '?after=')
+        page_obj = response.context['page_obj']
+        seen.extend(post.pk for post in page_obj)
+        while page_obj.has_next():
+            response = self.client.get(
+                url, {'after': page_obj.next_cursor})
+            page_obj = response.context['page_obj']
+            self.assertIsInstance(page_obj, CursorPage)
+            seen.extend(post.pk for post in page_obj)
+        return seen, page_obj
+
+    def test_cursor_roundtrip(self):
+        """Токен курсора кодирует и раскодирует позицию поста."""
+        post = Post.objects.first()
+        self.assertEqual(
+            decode_cursor(encode_cursor(post)),
+            (post.pub_date, post.author_id, post.pk))
+        self.assertIsNone(decode_cursor('не-токен'))
+
+    def test_out_of_range_cursor_is_ignored(self):
+        """Подделанный токен с огромным id даёт первую страницу, а не 500."""
+        for author_id, pk in ((2 ** 63, 1), (1, 2 ** 70), (-1, 1)):
+            with self.subTest(author_id=author_id, pk=pk):
+                token = base64.urlsafe_b64encode(
+                    f'2020-01-01T00:00:00+00:00|{author_id}|{pk}'.encode()
+                ).decode().rstrip('=')
+                self.assertIsNone(decode_cursor(token))
+                response = self.client.get(
+                    reverse('posts:index'), {'after': token})
+                self.assertEqual(response.status_code, 200)
+
+    def test_after_walks_whole_feed(self):
+        """Проход по ?after= выдаёт все посты ленты ровно один раз."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'cursor'}),
+        ):
+            with self.subTest(url=url):
+                seen, _ = self.walk(url)
+                self.assertEqual(seen, self.expected)
+
+    def test_before_walks_back(self):
+        """?before= возвращает предыдущую страницу в том же порядке."""
+        url = reverse('posts:index')
+        first = self.client.get(url).context['page_obj']
+        second = self.client.get(
+            url, {'after': encode_cursor(first[len(first) - 1])}
+        ).context['page_obj']
+        back = self.client.get(
+            url, {'before': second.previous_cursor}).context['page_obj']
+        self.assertEqual(
+            [post.pk for post in back], [post.pk for post in first])
+        self.assertFalse(back.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый токен открывает первую страницу ленты."""
+        response = self.client.get(reverse('posts:index'), {'after': '%%%'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(
+            [post.pk for post in page_obj],
+            self.expected[:settings.POSTS_ON_PAGE],
+        )
+
+    def test_cursor_page_skips_count(self):
+        """Курсорная страница строится одним запросом без COUNT(*)."""
+        post = Post.objects.order_by(*CURSOR_ORDERING)[
+            settings.POSTS_ON_PAGE * 2]
+        request = self.client.get(reverse('posts:index')).wsgi_request
+        request.GET = request.GET.copy()
+        request.GET['after'] = encode_cursor(post)
+        with self.assertNumQueries(1):
+            page_obj = get_page_context(request, Post.objects.all())
+            self.assertEqual(len(page_obj), 4)
+
+    def test_page_mode_still_works(self):
+        """Режим ?page= по-прежнему отдаёт обычную страницу Paginator."""
+        response = self.client.get(reverse('posts:index'), {'page': 2})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(len(page_obj), settings.POSTS_ON_PAGE)
+
+
+class ElidedPageRangeTest(TestCase):
+    def test_short_range_is_full(self):
+        """Немного страниц выводятся все."""
+        self.assertEqual(elided_page_range(1, 5), [1, 2, 3, 4, 5])
+
+    def test_long_range_is_elided(self):
+        """Длинный список сжимается до краёв и соседей текущей."""
+        self.assertEqual(
+            elided_page_range(50, 100_000),
+            [1, PAGE_ELLIPSIS, 48, 49, 50, 51, 52, PAGE_ELLIPSIS, 100_000],
+        )
+        self.assertEqual(
+            elided_page_range(1, 100_000),
+            [1, 2, 3, PAGE_ELLIPSIS, 100_000],
+        )
+        self.assertEqual(
+            elided_page_range(100_000, 100_000),
+            [1, PAGE_ELLIPSIS, 99_998, 99_999, 100_000],
+        )
+
+    @override_settings(POSTS_ON_PAGE=1)
+    def test_paginator_renders_window(self):
+        """Навигация ленты не растёт вместе с числом страниц."""
+        user = User.objects.create_user(username='pages')
+        for number in range(30):
+            Post.objects.create(text=f'Пост №{number}', author=user)
+        cache.clear()
+        response = self.client.get(reverse('posts:index'), {'page': 15})
+        self.assertContains(response, 'class="page-link" href="?page=', 10)
+        self.assertContains(response, PAGE_ELLIPSIS, 2)
+
+
+class CountedPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='counted')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='counted-slug',
+            description='Тестовое описание',
+        )
+        for number in range(25):
+            Post.objects.create(
+                text=f'Пост №{number}', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if 'COUNT(' in query['sql']]
+
+    def test_feeds_take_count_from_counters(self):
+        """Ленты группы и автора не считают посты через COUNT(*)."""
+        for url in (
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'counted'}),
+        ):
+            with self.subTest(url=url):
+                self.assertFalse(self.count_queries(url, {'page': 2}))
+                self.assertEqual(
+                    self.client.get(url).context['page_obj'].paginator.count,
+                    25,
+                )
+
+    def test_index_count_is_cached(self):
+        """Число постов главной считается один раз на поколение ленты."""
+        url = reverse('posts:index')
+        self.assertTrue(self.count_queries(url, {'page': 1}))
+        self.assertFalse(self.count_queries(url, {'page': 2}))
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.client.get(url, {'page': 3})
+        self.assertEqual(response.context['page_obj'].paginator.count, 26)
+
+    @override_settings(FEED_EXACT_COUNT_LIMIT=10)
+    def test_large_feed_count_is_estimated(self):
+        """За порогом число постов оценивается, а не считается."""
+        posts = Post.objects.all()
+        self.assertEqual(bounded_count(posts.filter(pk__lte=0), 10), 0)
+        with self.assertNumQueries(2):
+            estimate = CountedPaginator(posts, 10).count
+        self.assertGreater(estimate, 10)
+        self.assertEqual(estimate, 25)
+
+    def test_filtered_feed_count_is_exact(self):
+        """Лента группы без счётчика не получает оценку по всей таблице."""
+        other = User.objects.create_user(username='other-author')
+        for number in range(5):
+            Post.objects.create(text=f'Чужой пост №{number}', author=other)
+        posts = Post.objects.filter(group=self.group)
+        self.assertEqual(bounded_count(posts, 10), 25)
+
+    def test_known_count_skips_queries(self):
+        """Переданное число постов используется без запросов."""
+        with self.assertNumQueries(0):
+            paginator = CountedPaginator(Post.objects.all(), 10, count=1000)
+            self.assertEqual(paginator.num_pages, 100)
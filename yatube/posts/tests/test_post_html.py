@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import EXCERPT_LENGTH, Group, Post, User
+
+
+class PostHtmlTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='html')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='html', description='Описание')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_save_renders_escaped_html(self):
+        """Post.save готовит экранированный HTML с абзацами и анонс."""
+        post = Post.objects.create(
+            text='<b>Первый</b>\n\nВторой ' + 'слово ' * 100,
+            author=self.user,
+        )
+        post.refresh_from_db()
+        self.assertTrue(post.text_html.startswith(
+            '<p>&lt;b&gt;Первый&lt;/b&gt;</p>\n\n<p>Второй'))
+        self.assertIn('…', post.excerpt_html)
+        self.assertLess(len(post.excerpt_html), EXCERPT_LENGTH + 50)
+
+    def test_text_change_rerenders(self):
+        """Правка текста, в том числе через update_fields, обновляет HTML."""
+        post = Post.objects.create(text='Старый', author=self.user)
+        post.text = 'Новый'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>Новый</p>')
+        self.assertEqual(post.excerpt_html, '<p>Новый</p>')
+
+    def test_feeds_skip_full_text(self):
+        """Ленты не читают полный текст поста и его HTML."""
+        Post.objects.create(
+            text='Пост ленты', author=self.user, group=self.group)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'html'}),
+            reverse('posts:profile', kwargs={'username': 'html'}),
+        ):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertContains(response, '<p>Пост ленты</p>')
+                for query in queries:
+                    self.assertNotIn('"posts_post"."text"', query['sql'])
+                    self.assertNotIn('"posts_post"."text_html"', query['sql'])
+
+    def test_detail_uses_rendered_html(self):
+        """Страница поста выводит сохранённый HTML."""
+        post = Post.objects.create(text='Строка\nстрока', author=self.user)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertContains(response, '<p>Строка<br>строка</p>')
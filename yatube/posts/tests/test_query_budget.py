@@ -0,0 +1,66 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import urls
+from ..models import Group, Post, User
+from .utils import QueryBudgetMixin
+
+
+class ViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    # Имя маршрута posts.urls: (число запросов, нужна ли авторизация).
+    budgets = {
+        'index': (2, False),
+        'group_list': (2, False),
+        'group_export': (2, False),
+        'profile': (2, False),
+        'profile_export': (2, False),
+        'post_detail': (2, False),
+        'search': (2, False),
+        'create': (3, True),
+        'post_edit': (4, True),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='budget')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='budget-slug',
+            description='Тестовое описание',
+        )
+        for number in range(15):
+            cls.post = Post.objects.create(
+                text=f'Пост №{number}',
+                author=cls.user,
+                group=cls.group if number % 2 else None,
+            )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_url(self, name):
+        kwargs = {
+            'group_list': {'slug': self.group.slug},
+            'group_export': {'slug': self.group.slug},
+            'profile': {'username': self.user.username},
+            'profile_export': {'username': self.user.username},
+            'post_detail': {'post_id': self.post.pk},
+            'post_edit': {'post_id': self.post.pk},
+        }.get(name, {})
+        url = reverse(f'posts:{name}', kwargs=kwargs)
+        if name == 'search':
+            url += '?q=Пост'
+        return url
+
+    def test_every_view_has_budget(self):
+        """Для каждого маршрута posts.urls задан бюджет запросов."""
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names, set(self.budgets))
+
+    def test_views_fit_budget(self):
+        """Число запросов не зависит от количества постов на странице."""
+        for name, (budget, login) in self.budgets.items():
+            client = self.authorized_client if login else self.client
+            self.assertQueryBudget(budget, self.get_url(name), client)
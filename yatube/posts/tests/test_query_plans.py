@@ -0,0 +1,86 @@
+import re
+import unittest
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..utils import encode_cursor
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?posts_post$')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN')
+class FeedQueryPlanTest(TestCase):
+    """Запросы лент идут по составным индексам, без полного скана и
+    без временного B-дерева для сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='planner')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='plan-slug',
+            description='Тестовое описание',
+        )
+        for number in range(settings.POSTS_ON_PAGE * 3):
+            Post.objects.create(
+                text=f'Пост №{number}',
+                author=cls.user,
+                group=cls.group,
+            )
+        cls.cursor = encode_cursor(
+            Post.objects.all()[settings.POSTS_ON_PAGE])
+
+    def setUp(self):
+        cache.clear()
+
+    def assertIndexedPlan(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        post_queries = [
+            query['sql'] for query in queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        self.assertTrue(post_queries)
+        for sql in post_queries:
+            plan = explain(sql)
+            with self.subTest(url=url, params=params, plan=plan):
+                self.assertFalse(
+                    [step for step in plan if FULL_SCAN.match(step)],
+                    f'Полный скан posts_post: {sql}',
+                )
+                self.assertFalse(
+                    [step for step in plan if 'TEMP B-TREE' in step],
+                    f'Сортировка во временном B-дереве: {sql}',
+                )
+
+    def test_feed_plans(self):
+        """Каждая лента во всех режимах пагинации использует индекс."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'planner'}),
+        )
+        modes = (
+            None,
+            {'page': 2},
+            {'after': ''},
+            {'after': self.cursor},
+            {'before': self.cursor},
+        )
+        for url in urls:
+            for params in modes:
+                self.assertIndexedPlan(url, params)
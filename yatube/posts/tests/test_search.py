@@ -0,0 +1,75 @@
+import unittest
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, User
+from ..search import search_posts
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5')
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='searcher', email='s@example.com', password='pass')
+
+    def setUp(self):
+        self.often = Post.objects.create(
+            text='Котики, котики и ещё раз котики', author=self.user)
+        self.once = Post.objects.create(
+            text='Один котики среди <b>собак</b>', author=self.user)
+        Post.objects.create(text='Про собак', author=self.user)
+
+    def test_ranked_results(self):
+        """Более релевантный пост идёт первым."""
+        posts, next_cursor = search_posts('котики', 10)
+        self.assertEqual(posts, [self.often, self.once])
+        self.assertIsNone(next_cursor)
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        """Совпадения подсвечены, а HTML из текста экранирован."""
+        response = self.client.get(reverse('posts:search'), {'q': 'собак'})
+        self.assertContains(response, '&lt;b&gt;<mark>собак</mark>')
+        self.assertNotContains(response, '<b>собак')
+
+    def test_index_follows_writes(self):
+        """Правка и удаление поста сразу отражаются в поиске."""
+        self.once.text = 'Теперь про хомяков'
+        self.once.save()
+        self.assertEqual(search_posts('котики', 10)[0], [self.often])
+        self.assertEqual(search_posts('хомяков', 10)[0], [self.once])
+        self.once.delete()
+        self.assertEqual(search_posts('хомяков', 10)[0], [])
+
+    def test_keyset_paging(self):
+        """Токен after отдаёт следующую страницу без повторов."""
+        for number in range(settings.POSTS_ON_PAGE + 3):
+            Post.objects.create(text=f'Слон №{number}', author=self.user)
+        first, next_cursor = search_posts('слон', settings.POSTS_ON_PAGE)
+        second, last_cursor = search_posts(
+            'слон', settings.POSTS_ON_PAGE, after=next_cursor)
+        self.assertEqual(len(first), settings.POSTS_ON_PAGE)
+        self.assertEqual(len(second), 3)
+        self.assertIsNone(last_cursor)
+        self.assertFalse(set(first) & set(second))
+
+    def test_operators_are_plain_words(self):
+        """Синтаксис FTS5 в запросе не ломает поиск."""
+        for query in ('"', 'котики OR', 'NEAR(', '*', ''):
+            with self.subTest(query=query):
+                response = self.client.get(
+                    reverse('posts:search'), {'q': query})
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через FTS-индекс, а не LIKE."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котики'})
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.often, self.once})
@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..models import Group, Post, User
+from ..search import search_posts
+
+
+class SeedCommandTest(TestCase):
+    def seed(self, **options):
+        call_command('seed_yatube', seed=1, stdout=StringIO(), **options)
+
+    def test_seed_creates_rows(self):
+        """Команда создаёт заданное число пользователей, групп и постов."""
+        self.seed(users=5, groups=2, posts=120)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 120)
+        call_command('rebuild_post_counters', check=True, stdout=StringIO())
+
+    def test_pub_dates_follow_insert_order(self):
+        """Даты постов растут вместе с id и лежат в прошлом."""
+        self.seed(users=3, groups=1, posts=50, days=10)
+        dates = list(
+            Post.objects.order_by('pk').values_list('pub_date', flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertLess(dates[0], dates[-1])
+
+    def test_names_skip_existing(self):
+        """Повторный запуск обходит занятые имена и слаги."""
+        User.objects.create_user(username='user1')
+        Group.objects.create(title='Ручная', slug='group-1')
+        self.seed(users=3, groups=2, posts=0)
+        self.seed(users=3, groups=2, posts=0)
+        self.assertEqual(User.objects.count(), 7)
+        self.assertEqual(Group.objects.count(), 5)
+
+    def test_password_hash_is_shared(self):
+        """Хэш пароля считается один раз и подходит всем пользователям."""
+        self.seed(users=3, groups=0, posts=0, password='secret')
+        hashes = set(User.objects.values_list('password', flat=True))
+        self.assertEqual(len(hashes), 1)
+        self.assertTrue(User.objects.first().check_password('secret'))
+
+    def test_search_index_survives_seed(self):
+        """После загрузки поиск видит и сгенерированные, и новые посты."""
+        self.seed(users=2, groups=1, posts=30)
+        word = Post.objects.first().text.split()[0].strip('.,')
+        self.assertTrue(search_posts(word, 10, None)[0])
+        post = Post.objects.create(
+            text='Уникальнейшее слово', author=User.objects.first())
+        self.assertEqual(
+            [found.pk for found in search_posts('Уникальнейшее', 10, None)[0]],
+            [post.pk],
+        )
+
+    def test_posts_need_authors(self):
+        """Посты без пользователей создать нельзя."""
+        with self.assertRaises(CommandError):
+            self.seed(users=0, groups=0, posts=10)
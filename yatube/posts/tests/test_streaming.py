@@ -0,0 +1,140 @@
+import gzip
+import zlib
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.compression import compress, compress_stream
+from ..models import Group, Post, User
+
+
+@override_settings(FEED_STREAMING=True, POSTS_ON_PAGE=3)
+class FeedStreamingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='streamer')
+        cls.group = Group.objects.create(
+            title='Поток', slug='stream', description='Описание')
+        for number in range(5):
+            Post.objects.create(
+                text=f'Потоковый пост №{number}', author=cls.user,
+                group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_head_sent_before_rows(self):
+        """Шапка уходит первым куском, посты — следующими."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                chunks = [c.decode() for c in response.streaming_content]
+                self.assertIn('<header>', chunks[0])
+                self.assertNotIn('<article>', chunks[0])
+                self.assertEqual(
+                    sum('<article>' in chunk for chunk in chunks), 3)
+                self.assertIn('</html>', chunks[-1])
+
+    def test_streamed_page_matches_rendered(self):
+        """Потоковая страница содержит те же посты, что и обычная."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                streamed = b''.join(
+                    self.client.get(url).streaming_content).decode()
+                cache.clear()
+                with override_settings(FEED_STREAMING=False):
+                    rendered = self.client.get(url).content.decode()
+                for number in (4, 3, 2):
+                    self.assertIn(f'Потоковый пост №{number}', streamed)
+                self.assertEqual(
+                    streamed.count('<hr>'), rendered.count('<hr>'))
+
+    def test_streamed_page_cached_for_anonymous(self):
+        """Дочитанная потоковая страница попадает в кэш страниц."""
+        b''.join(self.client.get(self.urls[0]).streaming_content)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.urls[0])
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'Потоковый пост №4')
+
+
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='packer')
+        for number in range(10):
+            Post.objects.create(text=f'Сжимаемый пост №{number}',
+                                author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_html_compressed_when_accepted(self):
+        """HTML сжимается gzip и распаковывается в ту же страницу."""
+        plain = self.client.get(reverse('posts:index'))
+        packed = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(packed['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', packed['Vary'])
+        self.assertLess(len(packed.content), len(plain.content))
+        self.assertEqual(gzip.decompress(packed.content), plain.content)
+        self.assertEqual(
+            int(packed['Content-Length']), len(packed.content))
+
+    def test_not_compressed_when_refused(self):
+        """Без gzip в Accept-Encoding или с q=0 тело не сжимается."""
+        for accept in ('', 'identity', 'gzip;q=0, identity'):
+            with self.subTest(accept=accept):
+                response = self.client.get(
+                    reverse('posts:index'), HTTP_ACCEPT_ENCODING=accept)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESS_MIN_SIZE=10 ** 6)
+    def test_tiny_body_not_compressed(self):
+        """Тело короче COMPRESS_MIN_SIZE отдаётся как есть."""
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_weak_etag_still_revalidates(self):
+        """Сжатый ответ получает слабый ETag, и по нему приходит 304."""
+        url = reverse('posts:index')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(FEED_STREAMING=True)
+    def test_stream_compressed_chunk_by_chunk(self):
+        """Каждый сжатый кусок потока распаковывается сразу."""
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(response.streaming_content)
+        head = decompressor.decompress(next(chunks)).decode()
+        self.assertIn('<header>', head)
+        rest = b''.join(decompressor.decompress(c) for c in chunks).decode()
+        self.assertIn('Сжимаемый пост №9', rest)
+
+    def test_stream_flushed_by_size_not_by_chunk(self):
+        """Мелкие куски сжимаются порциями почти как целое тело."""
+        rows = [f'{number},Строка выгрузки №{number}\n'.encode()
+                for number in range(5000)]
+        parts = list(compress_stream(iter(rows), 'gzip', 6, 16 * 1024))
+        body = b''.join(parts)
+        self.assertEqual(gzip.decompress(body), b''.join(rows))
+        self.assertLess(len(parts), len(rows) // 10)
+        self.assertLess(
+            len(body), len(compress(b''.join(rows), 'gzip', 6)) * 1.1)
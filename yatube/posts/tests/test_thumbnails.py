@@ -0,0 +1,124 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default
+
+from .. import thumbnails
+from ..models import Post, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(name='photo.png', size=(1600, 900)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class PostThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='photographer')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_thumbnails_ready_after_save(self):
+        """После сохранения поста есть миниатюры всех размеров."""
+        post = Post.objects.create(
+            text='С картинкой', author=self.user, image=image_file())
+        feed = thumbnails.lookup(post.image, 'feed')
+        detail = thumbnails.lookup(post.image, 'detail')
+        self.assertEqual((feed.width, feed.height), (960, 339))
+        self.assertEqual(detail.width, 1200)
+        self.assertTrue(default.storage.exists(feed.name))
+
+    def test_upload_through_form(self):
+        """Картинка загружается вместе с новым постом."""
+        self.client.force_login(self.user)
+        self.client.post(reverse('posts:create'), {
+            'text': 'Пост с загрузкой',
+            'image': image_file('upload.png'),
+        })
+        post = Post.objects.get(text='Пост с загрузкой')
+        self.assertTrue(post.image.name.startswith('posts/upload'))
+        self.assertIsNotNone(thumbnails.lookup(post.image, 'feed'))
+
+    def test_feed_shows_ready_thumbnail(self):
+        """Лента выводит готовую миниатюру, а пост — свою."""
+        post = Post.objects.create(
+            text='Картинка', author=self.user, image=image_file())
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, thumbnails.lookup(
+            post.image, 'feed').url)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertContains(response, thumbnails.lookup(
+            post.image, 'detail').url)
+
+    def test_feed_never_resizes_inline(self):
+        """На промахе лента отдаёт оригинал и ставит миниатюры в очередь."""
+        post = Post.objects.create(
+            text='Без миниатюр', author=self.user, image=image_file())
+        default.kvstore.clear()
+        cache.clear()
+        with mock.patch.object(
+                default.backend, 'get_thumbnail') as get_thumbnail, \
+                mock.patch.object(
+                    thumbnails.pool, 'enabled', return_value=True), \
+                mock.patch(
+                    'posts.templatetags.post_images.schedule') as schedule:
+            response = self.client.get(reverse('posts:index'))
+        get_thumbnail.assert_not_called()
+        schedule.assert_called_once_with(post.image)
+        self.assertContains(response, post.image.url)
+
+    def test_feed_page_looks_up_thumbnails_at_once(self):
+        """На холодном кэше лента ищет миниатюры страницы одним запросом."""
+        posts = [
+            Post.objects.create(
+                text=f'Картинка {number}', author=self.user,
+                image=image_file(f'batch{number}.png'))
+            for number in range(3)
+        ]
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming), \
+                    self.settings(FEED_STREAMING=streaming):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse('posts:index'))
+                    content = b''.join(
+                        response.streaming_content) if streaming \
+                        else response.content
+                kvstore_queries = [
+                    query for query in queries.captured_queries
+                    if 'thumbnail_kvstore' in query['sql']
+                ]
+                self.assertEqual(len(kvstore_queries), 1)
+                for post in posts:
+                    self.assertIn(thumbnails.lookup(
+                        post.image, 'feed').url.encode(), content)
+
+    def test_pool_skips_queued_image(self):
+        """Картинка, уже стоящая в очереди, второй раз не ставится."""
+        with mock.patch.object(thumbnails.pool, 'submit') as submit:
+            thumbnails.submit('posts/queued.png', None)
+            thumbnails.submit('posts/queued.png', None)
+        self.assertEqual(submit.call_count, 1)
+        thumbnails._pending.discard('posts/queued.png')
@@ -0,0 +1,21 @@
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+
+class QueryBudgetMixin:
+    """Проверка, что страница укладывается в фиксированное число запросов
+    при любом размере страницы ленты."""
+
+    page_sizes = (1, 10)
+
+    def assertQueryBudget(self, budget, url, client=None):
+        client = client or self.client
+        for page_size in self.page_sizes:
+            with self.subTest(url=url, page_size=page_size):
+                cache.clear()
+                with override_settings(POSTS_ON_PAGE=page_size):
+                    with self.assertNumQueries(budget):
+                        response = client.get(url)
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,152 @@
+"""Миниатюры картинок постов.
+
+Миниатюры всех размеров POST_THUMBNAILS готовит пул фоновых потоков
+сразу после сохранения поста. Файлы лежат в хранилище sorl-thumbnail,
+их адреса и размеры — в его KV-хранилище. Шаблоны только ищут готовую
+миниатюру (lookup) и никогда не режут картинку сами; ленты находят
+миниатюры всей страницы разом (prefetch).
+"""
+import logging
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import base, default
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from core.workers import WorkerPool
+
+logger = logging.getLogger('yatube.thumbnails')
+
+pool = WorkerPool('thumbnails', 'THUMBNAIL_WORKERS')
+
+_lock = threading.Lock()
+# Картинки, чьи миниатюры уже в очереди: повторы не ставятся.
+_pending = set()
+
+
+class ThumbnailBackend(base.ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, который умеет найти миниатюру, не создавая."""
+
+    def thumbnail_file(self, file_, geometry_string, **options):
+        """Файл, под которым лежала бы миниатюра; картинку не читает."""
+        source = ImageFile(file_)
+        # Опции дополняются так же, как в get_thumbnail(): от них
+        # зависит имя файла миниатюры.
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+    def lookup(self, file_, geometry_string, **options):
+        """Готовая миниатюра из KV-хранилища или None."""
+        return default.kvstore.get(
+            self.thumbnail_file(file_, geometry_string, **options))
+
+
+def thumbnail_file(image, size):
+    geometry, options = settings.POST_THUMBNAILS[size]
+    return default.backend.thumbnail_file(image, geometry, **options)
+
+
+def lookup(image, size):
+    return default.kvstore.get(thumbnail_file(image, size))
+
+
+def lookup_many(images, size):
+    """{имя картинки: миниатюра или None} для пачки картинок.
+
+    KV-хранилище cached_db ищет каждый ключ отдельно и на промахе кэша
+    ходит в базу. Здесь ключи всей пачки читаются одним get_many, а
+    промахи — одним запросом к таблице sorl; найденное и ненайденное
+    кладётся в кэш так же, как это делает само хранилище.
+    """
+    files = {image.name: thumbnail_file(image, size) for image in images}
+    kvstore = default.kvstore
+    if not isinstance(kvstore, cached_db_kvstore.KVStore):
+        return {name: kvstore.get(file_) for name, file_ in files.items()}
+    keys = {name: add_prefix(file_.key) for name, file_ in files.items()}
+    values = kvstore.cache.get_many(list(keys.values()))
+    missing = [key for key in keys.values() if key not in values]
+    if missing:
+        found = dict(KVStore.objects.filter(
+            key__in=missing).values_list('key', 'value'))
+        fetched = {
+            key: found.get(key, cached_db_kvstore.EMPTY_VALUE)
+            for key in missing
+        }
+        kvstore.cache.set_many(
+            fetched, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(fetched)
+    return {
+        name: (
+            None if values[key] == cached_db_kvstore.EMPTY_VALUE
+            else deserialize_image_file(values[key]))
+        for name, key in keys.items()
+    }
+
+
+def prefetch(posts, size):
+    """Находит миниатюры постов страницы разом: post.thumbnails[size].
+
+    Тег post_thumbnail берёт готовый ответ и не ищет миниатюру сам.
+    """
+    posts = [post for post in posts if post.image]
+    found = lookup_many([post.image for post in posts], size)
+    for post in posts:
+        post.thumbnails = {size: found[post.image.name]}
+
+
+def generate(name, on_ready=None):
+    """Создаёт недостающие миниатюры картинки и зовёт on_ready, если
+    появилась хотя бы одна."""
+    try:
+        created = False
+        for size, (geometry, options) in settings.POST_THUMBNAILS.items():
+            if lookup(name, size) is None:
+                default.backend.get_thumbnail(name, geometry, **options)
+                created = True
+        if created and on_ready is not None:
+            on_ready()
+    except Exception:
+        logger.exception('Не удалось подготовить миниатюры %s', name)
+    finally:
+        with _lock:
+            _pending.discard(name)
+
+
+def submit(name, on_ready):
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    pool.submit(generate, name, on_ready)
+
+
+def schedule(image, on_ready=None):
+    """Ставит миниатюры картинки в очередь пула THUMBNAIL_WORKERS.
+
+    Без пула (THUMBNAIL_WORKERS = 0, SQLite в памяти) миниатюры
+    создаются сразу.
+    """
+    if not image:
+        return
+    name = getattr(image, 'name', image)
+    if not pool.enabled():
+        generate(name, on_ready)
+        return
+    # Поток пула работает в своём соединении и должен увидеть
+    # закоммиченный пост; при откате транзакции задача не ставится.
+    transaction.on_commit(partial(submit, name, on_ready))
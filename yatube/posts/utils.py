@@ -1,9 +1,197 @@
+import base64
+import binascii
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+
+CURSOR_ORDERING = ('-pub_date', 'author', 'pk')
+
+# Наибольший id: INTEGER в SQLite — знаковое 64-битное число.
+MAX_ID = 2 ** 63 - 1
+
+PAGE_ELLIPSIS = '…'
+
+
+def encode_cursor(post):
+    """Непрозрачный токен позиции поста в ленте: (pub_date, author, id)."""
+    raw = f'{post.pub_date.isoformat()}|{post.author_id}|{post.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает (pub_date, author_id, id) или None для битого токена."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        pub_date, author_id, pk = raw.decode().split('|')
+        pub_date = parse_datetime(pub_date)
+        author_id, pk = int(author_id), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    # Число вне INTEGER базы уронило бы запрос OverflowError.
+    if not (0 <= author_id <= MAX_ID and 0 <= pk <= MAX_ID):
+        return None
+    return pub_date, author_id, pk
+
+
+class CursorPage:
+    """Страница ленты в курсорном режиме (?after= / ?before=).
+
+    Повторяет ту часть интерфейса Page, которой пользуются шаблоны.
+    """
+    cursor = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+def get_cursor_page(post_list, per_page, after=None, before=None):
+    """Keyset-пагинация без COUNT(*) и OFFSET.
+
+    Порядок совпадает с Post.Meta.ordering, id лишь разрешает совпадения,
+    поэтому выборка идёт по индексам ленты без сортировки.
+    """
+    after = decode_cursor(after) if after else None
+    before = None if after else (decode_cursor(before) if before else None)
+    if before is not None:
+        pub_date, author_id, pk = before
+        posts = list(post_list.filter(pub_date__gte=pub_date).exclude(
+            Q(pub_date=pub_date)
+            & (Q(author__gt=author_id) | Q(author=author_id, pk__gte=pk))
+        ).order_by('pub_date', '-author', '-pk')[:per_page + 1])
+        if posts:
+            has_previous = len(posts) > per_page
+            posts = posts[:per_page][::-1]
+            return CursorPage(posts, has_next=True, has_previous=has_previous)
+    if after is not None:
+        pub_date, author_id, pk = after
+        post_list = post_list.filter(pub_date__lte=pub_date).exclude(
+            Q(pub_date=pub_date)
+            & (Q(author__lt=author_id) | Q(author=author_id, pk__lte=pk))
+        )
+    posts = list(post_list.order_by(*CURSOR_ORDERING)[:per_page + 1])
+    return CursorPage(
+        posts[:per_page],
+        has_next=len(posts) > per_page,
+        has_previous=after is not None,
+    )
+
+
+def elided_page_range(number, num_pages, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, пропуски — PAGE_ELLIPSIS.
+
+    Длина не зависит от числа страниц: не больше 2 * (on_each_side +
+    on_ends) + 3 элементов.
+    """
+    if num_pages <= 2 * (on_each_side + on_ends) + 1:
+        return list(range(1, num_pages + 1))
+    pages = list(range(1, on_ends + 1))
+    window_start = max(number - on_each_side, on_ends + 1)
+    window_end = min(number + on_each_side, num_pages - on_ends)
+    if window_start > on_ends + 1:
+        pages.append(PAGE_ELLIPSIS)
+    pages.extend(range(window_start, window_end + 1))
+    if window_end < num_pages - on_ends:
+        pages.append(PAGE_ELLIPSIS)
+    pages.extend(range(num_pages - on_ends + 1, num_pages + 1))
+    return pages
+
+
+def bounded_count(queryset, limit):
+    """Точное число строк до limit, дальше — оценка по диапазону id.
+
+    COUNT по подзапросу с LIMIT читает не больше limit + 1 строк индекса,
+    а MIN/MAX по первичному ключу SQLite берёт из краёв B-дерева.
+    Диапазон id покрывает всю таблицу, поэтому отфильтрованную выборку
+    (лента группы или автора без счётчика) считаем точно.
+    """
+    queryset = queryset.order_by()
+    exact = queryset[:limit + 1].count()
+    if exact <= limit:
+        return exact
+    if queryset.query.has_filters():
+        return queryset.count()
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    return max(limit + 1, bounds['high'] - bounds['low'] + 1)
+
+
+class CountedPaginator(Paginator):
+    """Paginator без COUNT(*) на каждый запрос.
+
+    Число объектов берётся из готового счётчика (count), из кэша по
+    count_key или, на промахе, из bounded_count с коротким TTL.
+    """
+
+    def __init__(self, object_list, per_page, count=None, count_key=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.count_key is not None:
+            count = cache.get(self.count_key)
+            if count is not None:
+                return count
+        count = bounded_count(
+            self.object_list, settings.FEED_EXACT_COUNT_LIMIT)
+        if self.count_key is not None:
+            cache.set(self.count_key, count, settings.FEED_COUNT_TIMEOUT)
+        return count
 
 
-def get_page_context(request, post_list):
-    paginator = Paginator(post_list, settings.POSTS_ON_PAGE)
+def get_page_context(request, post_list, count=None, count_key=None):
+    if 'after' in request.GET or 'before' in request.GET:
+        return get_cursor_page(
+            post_list,
+            settings.POSTS_ON_PAGE,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    paginator = CountedPaginator(
+        post_list, settings.POSTS_ON_PAGE, count=count, count_key=count_key)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.elided_page_range = elided_page_range(
+        page_obj.number, paginator.num_pages)
     return page_obj
@@ -1,51 +1,166 @@
+import hashlib
+
 from django.shortcuts import get_object_or_404, render, redirect
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ObjectDoesNotExist
+from django.views.decorators.http import condition
 
-from .models import Group, Post, User
+from .cache import (INDEX_FEED, anonymous_page_cache, author_feed,
+                    feed_count_key, feed_etag, feed_last_modified,
+                    get_feed_version, group_feed, index_feed,
+                    primary_while_settling)
+from .models import Post
+from .export import export_response
 from .forms import PostForm
+from .loaders import get_author_or_404, get_group_or_404
+from .search import search_posts
+from .streaming import render_feed
 from .utils import get_page_context
 
 
+# Ленты выводят готовый анонс, полный текст им не нужен.
+FEED_DEFERRED = ('text', 'text_html')
+
+
+def stats_count(owner):
+    """Число постов из счётчика автора или группы; None, если его нет."""
+    try:
+        return owner.stats.posts_count
+    except ObjectDoesNotExist:
+        return None
+
+
+@condition(etag_func=feed_etag(index_feed),
+           last_modified_func=feed_last_modified(index_feed))
+@primary_while_settling(index_feed)
+@anonymous_page_cache(index_feed)
 def index(request):
     context = {
-        'page_obj': get_page_context(request, Post.objects.all())
+        'feed_version': get_feed_version(INDEX_FEED),
+        'page_obj': get_page_context(
+            request,
+            Post.objects.select_related('author', 'group').defer(
+                *FEED_DEFERRED),
+            count_key=feed_count_key(INDEX_FEED),
+        ),
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(
+        request, 'posts/index.html', context,
+        'posts/includes/index_post.html')
 
 
+@condition(etag_func=feed_etag(group_feed),
+           last_modified_func=feed_last_modified(group_feed))
+@primary_while_settling(group_feed)
+@anonymous_page_cache(group_feed)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = get_group_or_404(slug)
+    posts = Post.objects.select_related('author').defer(
+        *FEED_DEFERRED).filter(group_id=group.pk)
     context = {
         'group': group,
-        'page_obj': get_page_context(request, posts),
+        'feed_version': get_feed_version(group_feed(slug)),
+        'page_obj': get_page_context(
+            request, posts, count=stats_count(group)),
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(
+        request, 'posts/group_list.html', context,
+        'posts/includes/group_post.html')
 
 
+@condition(etag_func=feed_etag(author_feed),
+           last_modified_func=feed_last_modified(author_feed))
+@primary_while_settling(author_feed)
+@anonymous_page_cache(author_feed)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = Post.objects.select_related('group',
-                                        ).filter(author__username=username)
+    author = get_author_or_404(username)
+    posts = Post.objects.select_related('group').defer(
+        *FEED_DEFERRED).filter(author_id=author.pk)
     context = {
         'author': author,
-        'page_obj': get_page_context(request, posts),
+        'feed_version': get_feed_version(author_feed(username)),
+        'page_obj': get_page_context(
+            request, posts, count=stats_count(author)),
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(
+        request, 'posts/profile.html', context,
+        'posts/includes/profile_post.html')
+
+
+def group_export(request, slug):
+    group = get_group_or_404(slug)
+    return export_response(
+        Post.objects.filter(group_id=group.pk),
+        request.GET.get('format'),
+        f'group-{group.slug}',
+    )
+
+
+def profile_export(request, username):
+    author = get_author_or_404(username)
+    return export_response(
+        Post.objects.filter(author_id=author.pk),
+        request.GET.get('format'),
+        f'profile-{author.username}',
+    )
+
 
+def post_state(request, post_id):
+    """Одна лёгкая выборка для ETag и Last-Modified страницы поста."""
+    if not hasattr(request, 'post_state'):
+        request.post_state = Post.objects.filter(pk=post_id).values_list(
+            'updated_at', 'author__stats__posts_count', 'author__username',
+            'author__first_name', 'author__last_name', 'group__title',
+            'group__slug').first()
+    return request.post_state
 
+
+def post_etag(request, post_id):
+    """Версия поста, счётчик и имя автора, группа и читатель."""
+    state = post_state(request, post_id)
+    if state is None:
+        return None
+    updated_at, *shown = state
+    raw = ':'.join(map(str, (
+        post_id, updated_at.isoformat(), *shown, request.user.pk)))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def post_last_modified(request, post_id):
+    state = post_state(request, post_id)
+    return state[0] if state else None
+
+
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group').defer(
+            'excerpt_html'),
+        pk=post_id,
+    )
     context = {
         'post': post
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts, next_cursor = search_posts(
+        query, settings.POSTS_ON_PAGE, after=request.GET.get('after'))
+    context = {
+        'query': query,
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     is_edit = False
-    form = PostForm(request.POST, None)
+    form = PostForm(request.POST, request.FILES or None)
     context = {
         'form': form,
         'is_edit': is_edit,
@@ -61,7 +176,7 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post_id)
 
     form = PostForm(
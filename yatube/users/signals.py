@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import User, invalidate_user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Смена пароля (PasswordChangeView), правка в админке или удаление
+    сбрасывают закэшированного пользователя сессии."""
+    invalidate_user(instance.pk)
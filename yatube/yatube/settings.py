@@ -1,5 +1,7 @@
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
@@ -19,6 +21,8 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    'sorl.thumbnail',
+
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
@@ -26,6 +30,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,7 +47,7 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backend.TimedDjangoTemplates',
         'DIRS': [
             os.path.join(BASE_DIR, 'templates'),
         ],
@@ -62,10 +70,72 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.environ.get(
+            'YATUBE_DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        # Соединение живёт между запросами, а не открывается на каждый.
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_DB_CONN_MAX_AGE', 60)),
     }
 }
+# Реплика только для чтения лент. Локально — второй файл SQLite, который
+# обновляет manage.py sync_replica; в тестах — зеркало default.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': os.environ.get(
+        'YATUBE_REPLICA_NAME', os.path.join(BASE_DIR, 'db.replica.sqlite3')),
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
 
+REPLICA_DATABASE = 'replica'
+
+# Представления, которые читают с реплики.
+REPLICA_VIEWS = {
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+}
+
+# Сколько секунд после записи клиент читает с основной базы, а
+# изменённая лента — у всех читателей (posts.cache.primary_while_settling);
+# должно перекрывать отставание реплики.
+REPLICA_STICKY_SECONDS = 10
+
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+# PRAGMA для каждого нового соединения SQLite (core.signals). Значение
+# переопределяется переменной окружения YATUBE_SQLITE_<ИМЯ>, например
+# YATUBE_SQLITE_SYNCHRONOUS=full.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    # В режиме WAL normal не теряет согласованность, только последние
+    # транзакции при отключении питания.
+    'synchronous': 'normal',
+    # Отрицательное значение — в КиБ: 64 МиБ кэша страниц.
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+SQLITE_PRAGMAS.update(
+    (pragma, os.environ[f'YATUBE_SQLITE_{pragma.upper()}'])
+    for pragma in list(SQLITE_PRAGMAS)
+    if f'YATUBE_SQLITE_{pragma.upper()}' in os.environ
+)
+
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+# Пользователь сессии читается из кэша, а не из базы на каждый запрос.
+USER_CACHE_TIMEOUT = 60 * 5
+
+# Хранилище сессий: cached_db — кэш с записью в базу, signed_cookies —
+# подписанная cookie без обращений к серверу.
+SESSION_MODE = os.environ.get('YATUBE_SESSION_MODE', 'cached_db')
+if SESSION_MODE not in ('cached_db', 'signed_cookies'):
+    raise ImproperlyConfigured(
+        f'Неизвестный YATUBE_SESSION_MODE: {SESSION_MODE}')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_MODE}'
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -96,19 +166,170 @@ USE_TZ = True
 POSTS_ON_PAGE = 10
 
 
+# Сброс кэшей после записи (поколения лент, загрузчики, кэш
+# пользователя) и cache.clear() из команд manage.py доходят только до
+# процессов с общим кэшем. LocMemCache по умолчанию годится для одного
+# процесса; с несколькими воркерами задайте общий бэкенд, например
+# YATUBE_CACHE_BACKEND=django.core.cache.backends.memcached.MemcachedCache
+# и YATUBE_CACHE_LOCATION=127.0.0.1:11211 (или DatabaseCache/
+# FileBasedCache с таблицей или каталогом в LOCATION).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'YATUBE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+FEED_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# До этого порога число постов ленты считается точно, дальше — оценка.
+FEED_EXACT_COUNT_LIMIT = 10_000
+
+FEED_COUNT_TIMEOUT = 60
+
+# YATUBE_FEED_STREAMING=1: ленты отдаются потоком — шапка страницы
+# уходит до выборки и рендера постов (posts.streaming).
+FEED_STREAMING = os.environ.get('YATUBE_FEED_STREAMING') == '1'
+
+# Группа и автор ленты по slug и username.
+LOADER_CACHE_TIMEOUT = 60
+
+# Доля запросов, которые замеряет PerformanceMiddleware: 1 — все,
+# в продакшене достаточно YATUBE_PERFORMANCE_SAMPLE_RATE=0.01–0.05,
+# 0 — выключено.
+PERFORMANCE_SAMPLE_RATE = float(
+    os.environ.get('YATUBE_PERFORMANCE_SAMPLE_RATE', 1.0))
+
+# Сколько последних замеров хранить на каждое представление.
+PERFORMANCE_WINDOW = 1000
+
+# Запросы дольше порога (мс) попадают в журнал медленных запросов.
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# Повтор одного и того же запроса пишется не чаще раза в окно, с.
+SLOW_QUERY_DEDUPE_SECONDS = 5 * 60
+
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        # Каждая строка — JSON-объект, удобный для агрегации.
+        'slow_queries': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'slow_queries',
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'static'),
 )
 
+STATIC_ROOT = os.environ.get(
+    'YATUBE_STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
+# YATUBE_STATIC_PIPELINE=1: collectstatic пишет имена с хэшем, manifest
+# и сжатые копии .gz (и .br, если установлен brotli).
+if os.environ.get('YATUBE_STATIC_PIPELINE') == '1':
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# YATUBE_SERVE_STATIC=1: Django сам отдаёт STATIC_ROOT (core.views.
+# serve_static), когда перед ним нет веб-сервера для статики.
+SERVE_STATIC = os.environ.get('YATUBE_SERVE_STATIC') == '1'
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.environ.get(
+    'YATUBE_MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# Миниатюры картинок постов: размер и опции sorl-thumbnail. Их готовит
+# пул из THUMBNAIL_WORKERS потоков; 0 — прямо при сохранении поста.
+POST_THUMBNAILS = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('1200', {'upscale': False}),
+}
+
+THUMBNAIL_WORKERS = int(os.environ.get('YATUBE_THUMBNAIL_WORKERS', 2))
+
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
+
+# CompressionMiddleware: тела короче порога не сжимаются, а типы не из
+# списка (картинки, архивы) уже сжаты.
+COMPRESS_MIN_SIZE = 512
+
+COMPRESS_LEVEL = 6
+
+# Потоковый ответ сбрасывается клиенту после первого куска и затем
+# каждые столько несжатых байт.
+COMPRESS_STREAM_FLUSH_SIZE = 16 * 1024
+
+COMPRESS_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Кэш для файлов с хэшем в имени: год.
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
 
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма (сброс пароля) ставятся в очередь core.mail и отправляются
+# пулом из EMAIL_QUEUE_WORKERS потоков через EMAIL_QUEUE_BACKEND;
+# 0 — прямо в запросе. Неудачное письмо повторяется через
+# EMAIL_QUEUE_RETRY_DELAY * 2**(n-1) с, после EMAIL_QUEUE_MAX_ATTEMPTS
+# попыток остаётся в очереди со статусом failed.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_QUEUE_WORKERS = int(os.environ.get('YATUBE_EMAIL_WORKERS', 2))
+
+EMAIL_QUEUE_BATCH_SIZE = 50
+
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+
+EMAIL_QUEUE_RETRY_DELAY = 30
+
+# Через сколько секунд письмо, зависшее в отправке, забирается снова.
+EMAIL_QUEUE_CLAIM_TIMEOUT = 300
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 